@@ -30,4 +30,9 @@ setuptools.setup(
         # 'PySide6' and 'tkinter' are GUI, not core.
         # The core library has no dependencies!
     ],
+
+    # Optional speed-ups: pip install -e .[fast]
+    extras_require={
+        "fast": ["numpy", "orjson"],
+    },
 )
@@ -0,0 +1,155 @@
+import io
+import os
+import posixpath
+import tarfile
+import time
+import zipfile
+from .writer import OutputBatch
+
+# Archive suffixes and the tarfile compression each one implies ("zip" for
+# zip files). Inputs and outputs are recognised by name alone.
+_SUFFIXES = {
+    ".zip": "zip",
+    ".tar": "",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tbz2": "bz2",
+    ".tar.xz": "xz",
+    ".txz": "xz",
+}
+ARCHIVE_SUFFIXES = tuple(_SUFFIXES)
+
+def _compression(path):
+    """"zip", a tarfile compression ("", "gz", "bz2", "xz") or None for other paths"""
+    lower = path.lower()
+    for suffix, compression in _SUFFIXES.items():
+        if lower.endswith(suffix):
+            return compression
+    return None
+
+def is_archive_name(path):
+    """True if path has a zip or tar archive suffix"""
+    return _compression(path) is not None
+
+def is_archive(path):
+    """True if path is an existing zip or tar archive file"""
+    return is_archive_name(path) and os.path.isfile(path)
+
+def safe_member_name(name):
+    """
+    A member name as a normalised relative path with "/" separators, or
+    None if it would point outside the folder the archive is unpacked into
+    (absolute paths, drive letters, "..").
+    """
+    name = posixpath.normpath(name.replace("\\", "/"))
+    if name.startswith("/") or ":" in name.split("/", 1)[0]:
+        return None
+    if name == ".." or name.startswith("../") or name == ".":
+        return None
+    return name
+
+def _iter_zip(path):
+    with zipfile.ZipFile(path) as archive:
+        # The central directory lists members in any order; read them in
+        # the order they are stored so the file is read front to back
+        for info in sorted(archive.infolist(), key=lambda info: info.header_offset):
+            if info.is_dir():
+                continue
+            yield info.filename, lambda info=info: archive.read(info)
+
+def _iter_tar(path):
+    # Stream mode: one forward pass through the (decompressed) tarball
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            yield member.name, lambda member=member: archive.extractfile(member).read()
+
+def iter_members(path, select=None):
+    """
+    Yield (name, data) for every regular file in a zip or tar archive, in
+    the order the members are stored, without extracting anything to disk.
+    Names are relative "/"-separated paths; members whose name would escape
+    the output folder are skipped with a warning.
+
+    select (optional) is called with each name, and only the members it
+    returns True for are decompressed and yielded.
+    """
+    members = _iter_zip if _compression(path) == "zip" else _iter_tar
+    for raw_name, read in members(path):
+        name = safe_member_name(raw_name)
+        if name is None:
+            print(f"Skipping unsafe archive member: {raw_name}")
+            continue
+        if select is None or select(name):
+            yield name, read()
+
+class ArchiveWriter:
+    """
+    An output archive (zip or tar, chosen by the path's suffix) that is
+    written sequentially, one member after another.
+
+    The archive is built in a temporary file next to path through an
+    OutputBatch, and only renamed into place by close(), so an interrupted
+    run leaves the previous archive (if any) untouched. Used as a context
+    manager it closes on success and is discarded on error.
+    """
+
+    def __init__(self, path, fsync=False):
+        compression = _compression(path)
+        if compression is None:
+            raise ValueError(f"Not an archive name: {path}")
+        self.path = path
+        self.names = set()
+        self.batch = OutputBatch(fsync=fsync)
+        self.file = self.batch.open(path, binary=True)
+        try:
+            if compression == "zip":
+                self.archive = zipfile.ZipFile(self.file, "w", zipfile.ZIP_DEFLATED)
+            else:
+                self.archive = tarfile.open(fileobj=self.file, mode=f"w|{compression}")
+        except BaseException:
+            self.file.close()
+            self.batch.abort()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def add(self, name, data):
+        """Append a member holding data (bytes); name may use os.sep or "/" separators"""
+        name = name.replace(os.sep, "/")
+        if name in self.names:
+            raise ValueError(f"Duplicate output in archive: {name}")
+        self.names.add(name)
+        if isinstance(self.archive, zipfile.ZipFile):
+            self.archive.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        """Finish the archive and move it into place"""
+        self.archive.close()
+        self.file.close()
+        self.batch.commit()
+
+    def abort(self):
+        """Discard the partly written archive"""
+        try:
+            self.archive.close()
+        except Exception:
+            pass
+        self.file.close()
+        self.batch.abort()
@@ -0,0 +1,490 @@
+"""
+Benchmark suite for the conversion engine.
+
+Run with: python -m subconverter.bench [--cues N] [--files N] [--save results.json]
+                                       [--compare baseline.json]
+
+A deterministic synthetic corpus (YouTube JSON with aAppend chains and
+multi-segment events, plus VTT) is generated in a temporary folder, then
+each stage (read, parse, every generator, write) and the full
+run_conversion path are timed. Results are flat {name: value} maps where
+lower is better, so two runs can be compared and regressions flagged.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from . import decoders, formats, processor
+
+WORDS = ["hello", "world", "the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog"]
+
+def iter_synthetic_cues(count):
+    """Yield a deterministic sequence of subtitle dictionaries"""
+    start = 0
+    for i in range(count):
+        text = " ".join(WORDS[(i + k) % len(WORDS)] for k in range(6))
+        yield {"start": start, "end": start + 1800, "text": text}
+        start += 1500
+
+def timed(func, repeat=3):
+    """Return the best wall time of func over a few runs"""
+    best = None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def peak_memory(func):
+    """Return (result, peak traced bytes) for one call of func"""
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+def bench_cue_store(count=100000):
+    """Compare list-of-dicts against CueTable for memory, building and generation"""
+    builders = {
+        "dicts": lambda: list(iter_synthetic_cues(count)),
+        "CueTable": lambda: formats.CueTable.from_cues(iter_synthetic_cues(count)),
+    }
+    results = {}
+    for name, build in builders.items():
+        subtitles, peak = peak_memory(build)
+        results[name] = {
+            "memory_bytes": peak,
+            "build_s": timed(build, repeat=1),
+            "srt_s": timed(lambda: formats.generate_srt(subtitles)),
+            "vtt_s": timed(lambda: formats.generate_vtt(subtitles)),
+        }
+        del subtitles
+
+    print(f"Cue store, {count} cues")
+    print(f"{'store':<10} {'memory MB':>10} {'build s':>9} {'srt s':>8} {'vtt s':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<10} {r['memory_bytes'] / 1e6:10.2f} {r['build_s']:9.3f}"
+            f" {r['srt_s']:8.3f} {r['vtt_s']:8.3f}"
+        )
+    return results
+
+def _legacy_parse_vtt(vtt_content):
+    """The regex-split VTT parser that iter_vtt_cues replaced, kept as a baseline"""
+    subtitles = []
+    vtt_content = vtt_content.replace("\r\n", "\n")
+    if vtt_content.strip().startswith("WEBVTT"):
+        vtt_content = re.sub(r"^WEBVTT.*?\n\n", "", vtt_content, flags=re.DOTALL)
+    for block in re.split(r"\n\n+", vtt_content.strip()):
+        lines = block.strip().split("\n")
+        if len(lines) < 2:
+            continue
+        timing_line_idx = next((i for i, line in enumerate(lines) if "-->" in line), -1)
+        if timing_line_idx == -1:
+            continue
+        timing_match = re.search(
+            r"(\d+:\d+:\d+\.\d+)\s+-->\s+(\d+:\d+:\d+\.\d+)", lines[timing_line_idx]
+        )
+        if not timing_match:
+            continue
+        start_time, end_time = timing_match.groups()
+        text = "\n".join(lines[timing_line_idx + 1:])
+        subtitles.append(
+            {"start": _legacy_time_to_ms(start_time), "end": _legacy_time_to_ms(end_time), "text": text}
+        )
+    return subtitles
+
+def _legacy_time_to_ms(time_str):
+    time_str = time_str.replace(",", ".")
+    parts = time_str.split(":")
+    sec_parts = parts[2].split(".")
+    milliseconds = int(sec_parts[1]) if len(sec_parts) > 1 else 0
+    return int(parts[0]) * 3600000 + int(parts[1]) * 60000 + int(sec_parts[0]) * 1000 + milliseconds
+
+def bench_vtt_parser(count=100000):
+    """Compare the single-pass VTT tokenizer against the legacy regex-split parser"""
+    content = formats.generate_vtt(list(iter_synthetic_cues(count)))
+    legacy_s = timed(lambda: _legacy_parse_vtt(content))
+    tokenizer_s = timed(lambda: formats.parse_vtt(content))
+
+    print(f"VTT parser, {count} cues ({len(content) / 1e6:.1f} MB)")
+    print(f"{'parser':<10} {'seconds':>9} {'cues/s':>12}")
+    print(f"{'legacy':<10} {legacy_s:9.3f} {count / legacy_s:12,.0f}")
+    print(f"{'tokenizer':<10} {tokenizer_s:9.3f} {count / tokenizer_s:12,.0f}")
+    print(f"speedup: {legacy_s / tokenizer_s:.2f}x")
+    return {"legacy_s": legacy_s, "tokenizer_s": tokenizer_s}
+
+def _legacy_ms_to_time(ms, separator):
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02}:{minutes:02}:{seconds:02}{separator}{ms:03}"
+
+def _legacy_render_all(subtitles):
+    """Per-format generation as save_output_files used to do it, kept as a baseline"""
+    srt = []
+    vtt = ["WEBVTT\n"]
+    for i, (start, end, text) in enumerate(formats.iter_rows(subtitles), 1):
+        srt.append(f"{i}\n{_legacy_ms_to_time(start, ',')} --> {_legacy_ms_to_time(end, ',')}\n{text.strip()}\n")
+    for i, (start, end, text) in enumerate(formats.iter_rows(subtitles), 1):
+        vtt.append(f"\n{i}\n{_legacy_ms_to_time(start, '.')} --> {_legacy_ms_to_time(end, '.')}\n{text.strip()}")
+    return {
+        "srt": "\n".join(srt),
+        "vtt": "\n".join(vtt),
+        "txt": formats.generate_plain_text(subtitles),
+        "json": json.dumps(formats.generate_json(subtitles), ensure_ascii=False, indent=2),
+    }
+
+def bench_render_formats(count=100000):
+    """Compare per-format generation against the shared RenderContext for a 4-format export"""
+    subtitles = formats.CueTable.from_cues(iter_synthetic_cues(count))
+    exts = list(formats.WRITERS)
+    separate_s = timed(lambda: _legacy_render_all(subtitles))
+    shared_s = timed(lambda: formats.render_formats(subtitles, exts))
+
+    print(f"4-format export (srt, vtt, txt, json), {count} cues")
+    print(f"{'renderer':<10} {'seconds':>9}")
+    print(f"{'separate':<10} {separate_s:9.3f}")
+    print(f"{'shared':<10} {shared_s:9.3f}")
+    print(f"speedup: {separate_s / shared_s:.2f}x")
+    return {"separate_s": separate_s, "shared_s": shared_s}
+
+def bench_timestamps(count=100000):
+    """Compare per-value timestamp encode/decode with the batch helpers (with and without NumPy)"""
+    values = formats.CueTable.from_cues(iter_synthetic_cues(count)).starts
+    strings = formats.ms_to_vtt_times(values)
+    numpy_module = formats.numpy
+
+    def without_numpy(func, *args):
+        formats.numpy = None
+        try:
+            return func(*args)
+        finally:
+            formats.numpy = numpy_module
+
+    def per_value_encode():
+        formats._timestamp_pair.cache_clear()
+        return [formats.ms_to_vtt_time(ms) for ms in values]
+
+    results = {
+        "encode_per_value_s": timed(per_value_encode),
+        "encode_batch_s": timed(lambda: without_numpy(formats.ms_to_vtt_times, values)),
+        "decode_per_value_s": timed(lambda: [formats.time_to_ms(t) for t in strings]),
+        "decode_batch_s": timed(lambda: without_numpy(formats.times_to_ms, strings)),
+    }
+    if numpy_module is not None:
+        results["encode_numpy_s"] = timed(lambda: formats.ms_to_vtt_times(values))
+        results["decode_numpy_s"] = timed(lambda: formats.times_to_ms(strings))
+
+    print(f"Timestamp codec, {count} values (NumPy {'available' if numpy_module else 'not installed'})")
+    print(f"{'path':<20} {'seconds':>9}")
+    for name, seconds in results.items():
+        print(f"{name[:-2]:<20} {seconds:9.3f}")
+    return results
+
+def bench_json_output(count=100000):
+    """Compare serialising the generate_json tree with the streaming JSON writer"""
+    subtitles = formats.CueTable.from_cues(iter_synthetic_cues(count))
+
+    def tree(style):
+        layout = {"indent": 2} if style == "pretty" else {"separators": (",", ":")}
+        return json.dumps(formats.generate_json(subtitles), ensure_ascii=False, **layout)
+
+    results = {
+        "tree_pretty_s": timed(lambda: tree("pretty")),
+        "tree_compact_s": timed(lambda: tree("compact")),
+        "stream_pretty_s": timed(lambda: formats.render_formats(subtitles, ["json"], "pretty")),
+        "stream_compact_s": timed(lambda: formats.render_formats(subtitles, ["json"], "compact")),
+    }
+
+    print(f"JSON output, {count} cues")
+    print(f"{'path':<20} {'seconds':>9}")
+    for name, seconds in results.items():
+        print(f"{name[:-2]:<20} {seconds:9.3f}")
+    return results
+
+def make_youtube_json(cue_count, seed=0):
+    """
+    Build a deterministic YouTube-style caption document with about
+    cue_count cues. Every cue is a multi-segment event, and roughly a third
+    are followed by aAppend newline events, as auto-captions produce.
+    Window/pen metadata that the converter ignores is included too.
+    """
+    rng = random.Random(seed)
+    events = [{"tStartMs": 0, "dDurationMs": cue_count * 2000, "id": 1, "wpWinPosId": 1, "wsWinStyleId": 1}]
+    start = 0
+    for _ in range(cue_count):
+        duration = rng.randint(800, 4000)
+        segs = [{"utf8": rng.choice(WORDS), "acAsrConf": 0}]
+        for _ in range(rng.randint(1, 5)):
+            segs.append({"utf8": " " + rng.choice(WORDS), "tOffsetMs": rng.randint(0, duration), "acAsrConf": 0})
+        events.append({"tStartMs": start, "dDurationMs": duration, "wWinId": 1, "segs": segs})
+        if rng.random() < 0.35:
+            events.append({"tStartMs": start + duration, "dDurationMs": 20, "wWinId": 1, "aAppend": 1, "segs": [{"utf8": "\n"}]})
+        start += rng.randint(duration // 2, duration)
+    return {
+        "wireMagic": "pb3",
+        "pens": [{}],
+        "wsWinStyles": [{}, {"mhModeHint": 2, "juJustifCode": 0, "sdScrollDir": 3}],
+        "wpWinPositions": [{}, {"apPoint": 6, "ahHorPos": 20, "avVerPos": 100, "rcRows": 2, "ccCols": 40}],
+        "events": events,
+    }
+
+def bench_json_decoders(count=100000, seed=0):
+    """Compare json.loads of the whole document with each installed JSON decoder backend"""
+    data = json.dumps(make_youtube_json(count, seed), ensure_ascii=False).encode("utf-8")
+
+    def decode(name):
+        return formats.CueTable.from_cues(formats.iter_json_cues(decoders.iter_json_buffer_events(data, name)))
+
+    results = {"json_loads_s": timed(lambda: formats.CueTable.from_cues(formats.convert_json_to_subtitles(json.loads(data))))}
+    for name in decoders.available_json_decoders():
+        results[f"{name}_s"] = timed(lambda: decode(name))
+
+    print(f"JSON decoding, {count} cues ({len(data) / 1e6:.1f} MB)")
+    print(f"{'backend':<20} {'seconds':>9}")
+    for name, seconds in results.items():
+        print(f"{name[:-2]:<20} {seconds:9.3f}")
+    return results
+
+def bench_clip(count=100000, seed=0):
+    """Compare parsing a whole VTT buffer and then cutting a window with parsing just the window"""
+    buffer = make_vtt(count, seed).encode("utf-8")
+    table = formats.CueTable.from_cues(formats.iter_vtt_cues_bytes(buffer))
+    # A window of 1% of the cues, two thirds of the way in
+    start = table.starts[count * 2 // 3]
+    end = table.starts[count * 2 // 3 + count // 100]
+
+    def parse_then_cut():
+        full = formats.CueTable.from_cues(formats.iter_vtt_cues_bytes(buffer))
+        return formats.CueIndex(full).clip(start, end)
+
+    def windowed():
+        cues = formats.iter_vtt_cues_bytes(buffer, start_ms=start)
+        return formats.CueTable.from_cues(formats.clip_cues(cues, start, end))
+
+    index = formats.CueIndex(table)
+    results = {
+        "parse_then_cut_s": timed(parse_then_cut),
+        "windowed_s": timed(windowed),
+        "index_build_s": timed(lambda: formats.CueIndex(table)),
+        "index_query_s": timed(lambda: index.overlapping(start, end)),
+    }
+
+    print(f"Clipping 1% of {count} VTT cues")
+    print(f"{'method':<16} {'seconds':>9}")
+    for name, seconds in results.items():
+        print(f"{name[:-2]:<16} {seconds:9.4f}")
+    return results
+
+def make_vtt(cue_count, seed=0):
+    """Build a deterministic WebVTT document with cue_count cues (ids, settings, multi-line text)"""
+    rng = random.Random(seed)
+    lines = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    start = 0
+    for i in range(cue_count):
+        duration = rng.randint(800, 4000)
+        lines.append(str(i + 1))
+        settings = " align:start position:0%" if i % 3 == 0 else ""
+        lines.append(f"{formats.ms_to_vtt_time(start)} --> {formats.ms_to_vtt_time(start + duration)}{settings}")
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 7))))
+        if rng.random() < 0.3:
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 7))))
+        lines.append("")
+        start += duration
+    return "\n".join(lines)
+
+def write_corpus(directory, files, cues_per_file, seed=0):
+    """Write files JSON and files VTT inputs into directory"""
+    for n in range(files):
+        with open(os.path.join(directory, f"caption_{n:04}.json"), "w", encoding="utf-8") as f:
+            json.dump(make_youtube_json(cues_per_file, seed + n), f, ensure_ascii=False)
+        with open(os.path.join(directory, f"caption_{n:04}.vtt"), "w", encoding="utf-8") as f:
+            f.write(make_vtt(cues_per_file, seed + n))
+
+def _legacy_write_outputs(rendered, output_base, config):
+    """Writes as save_output_files used to: makedirs per format, then an in-place write"""
+    for ext, content in rendered.items():
+        if config["separate_folders"]:
+            path = os.path.join(config["output_dir"], ext, f"{output_base}.{ext}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        else:
+            path = os.path.join(config["output_dir"], f"{output_base}.{ext}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+def bench_small_writes(files=500, cues=20):
+    """Compare small-file write throughput: legacy in-place writes against OutputBatch (with and without fsync)"""
+    subtitles = formats.CueTable.from_cues(iter_synthetic_cues(cues))
+    rendered = formats.render_formats(subtitles, list(formats.WRITERS))
+    size = sum(len(text.encode("utf-8")) for text in rendered.values())
+
+    def run(write, fsync=False):
+        with tempfile.TemporaryDirectory() as out_dir:
+            config = {"output_dir": out_dir, "separate_folders": True, "fsync": fsync}
+            began = time.perf_counter()
+            for i in range(files):
+                write(rendered, f"file_{i:05}", config)
+            return time.perf_counter() - began
+
+    results = {
+        "legacy_s": min(run(_legacy_write_outputs) for _ in range(3)),
+        "batched_s": min(run(processor._write_outputs) for _ in range(3)),
+        "batched_fsync_s": run(processor._write_outputs, fsync=True),
+    }
+    print(f"Small-file writes: {files} inputs x 4 formats ({size / 1024:.1f} KiB per input), separate folders")
+    print(f"{'writer':<14} {'seconds':>9} {'files/s':>10}")
+    for name, seconds in results.items():
+        print(f"{name[:-2]:<14} {seconds:9.3f} {files * 4 / seconds:10,.0f}")
+    return results
+
+def bench_stages(path, input_format, repeat=3):
+    """Time each stage of converting one file: read, parse, each generator, write"""
+    results = {}
+    content, _ = processor._read_input(path)
+    results["read_s"] = timed(lambda: processor._read_input(path), repeat)
+
+    def parse():
+        return formats.CueTable.from_cues(processor.iter_buffer_cues(content, input_format))
+
+    subtitles = parse()
+    results["parse_s"] = timed(parse, repeat)
+
+    rendered = {}
+    for ext in formats.WRITERS:
+        rendered.update(formats.render_formats(subtitles, [ext]))
+        results[f"generate_{ext}_s"] = timed(lambda: formats.render_formats(subtitles, [ext]), repeat)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        config = {"output_dir": out_dir, "separate_folders": False}
+        results["write_s"] = timed(lambda: processor._write_outputs(rendered, "bench", config), repeat)
+    return results
+
+def bench_run_conversion(corpus_dir, input_format, workers=1, repeat=1):
+    """Time the full run_conversion path over the corpus"""
+    with tempfile.TemporaryDirectory() as out_dir:
+        config = {
+            "input_path": corpus_dir,
+            "output_dir": out_dir,
+            "input_format": input_format,
+            "is_directory": True,
+            "export_srt": True,
+            "export_vtt": True,
+            "export_txt": True,
+            "export_json": True,
+            "separate_folders": False,
+            "naming_strategy": "source",
+            "custom_name": "output",
+            "suffix_text": "_subtitle",
+            "workers": workers,
+        }
+        return timed(lambda: processor.run_conversion(config), repeat)
+
+def run_suite(cues, files, repeat, seed=0, workers=1):
+    """Run every benchmark and return a flat {name: value} map (lower is better)"""
+    results = {}
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        write_corpus(corpus_dir, files, cues, seed)
+        for input_format in ("json", "vtt"):
+            path = os.path.join(corpus_dir, f"caption_0000.{input_format}")
+            for name, value in bench_stages(path, input_format, repeat).items():
+                results[f"stages.{input_format}.{name}"] = value
+            results[f"run_conversion.{input_format}_s"] = bench_run_conversion(corpus_dir, input_format)
+            if workers > 1:
+                results[f"run_conversion.{input_format}_j{workers}_s"] = bench_run_conversion(
+                    corpus_dir, input_format, workers
+                )
+
+    for store, values in bench_cue_store(cues).items():
+        for name, value in values.items():
+            results[f"cue_store.{store}.{name}"] = value
+    for name, value in bench_vtt_parser(cues).items():
+        results[f"vtt_parser.{name}"] = value
+    for name, value in bench_render_formats(cues).items():
+        results[f"render_formats.{name}"] = value
+    for name, value in bench_timestamps(cues).items():
+        results[f"timestamps.{name}"] = value
+    for name, value in bench_json_decoders(cues, seed).items():
+        results[f"json_decoders.{name}"] = value
+    for name, value in bench_json_output(cues).items():
+        results[f"json_output.{name}"] = value
+    for name, value in bench_clip(cues, seed).items():
+        results[f"clip.{name}"] = value
+    for name, value in bench_small_writes().items():
+        results[f"small_writes.{name}"] = value
+    return results
+
+def compare(results, baseline, threshold):
+    """Return [(name, old, new, ratio)] for results that got worse by more than threshold"""
+    regressions = []
+    for name, new in sorted(results.items()):
+        old = baseline.get(name)
+        if not old:
+            continue
+        ratio = new / old
+        if ratio > 1 + threshold:
+            regressions.append((name, old, new, ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the subtitle conversion engine.")
+    parser.add_argument("--cues", type=int, default=20000, help="Cues per synthetic file (default: 20000).")
+    parser.add_argument("--files", type=int, default=20, help="Files per format in the corpus (default: 20).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is kept (default: 3).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus (default: 0).")
+    parser.add_argument("-j", "--jobs", type=int, default=1, dest="workers", help="Also time run_conversion with N workers.")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON to FILE.")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a previous --save file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown that counts as a regression (default: 0.10)."
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.cues, args.files, args.repeat, args.seed, args.workers)
+
+    print()
+    for name, value in sorted(results.items()):
+        print(f"{name:<40} {value:14.4f}")
+
+    if args.save:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cues": args.cues,
+                "files": args.files,
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for name, old, new, ratio in regressions:
+                print(f"  {name:<38} {old:12.4f} -> {new:12.4f} ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%} compared to {args.compare}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,87 @@
 import argparse
+import asyncio
+import cProfile
+import math
 import os
-from . import processor
+import pstats
+import sys
+from . import decoders, processor, transforms
+from .metrics import MetricsCollector
 
-def main():
-    parser = argparse.ArgumentParser(description="Convert JSON/VTT subtitles.")
+def _factor(value):
+    """argparse type for --scale: a number or a ratio such as 25/23.976"""
+    try:
+        if "/" in value:
+            numerator, denominator = value.split("/", 1)
+            factor = float(numerator) / float(denominator)
+        else:
+            factor = float(value)
+    except (ValueError, ZeroDivisionError):
+        raise argparse.ArgumentTypeError(f"invalid scale factor: {value}")
+    if not math.isfinite(factor):
+        raise argparse.ArgumentTypeError(f"invalid scale factor: {value}")
+    if factor <= 0:
+        raise argparse.ArgumentTypeError(f"scale factor must be positive: {value}")
+    return factor
+
+def _time_ms(value):
+    """argparse type for --from/--to: seconds, MM:SS or HH:MM:SS (fractions allowed), in ms"""
+    try:
+        seconds = 0.0
+        for part in value.split(":"):
+            seconds = seconds * 60 + float(part)
+        if not math.isfinite(seconds):
+            raise ValueError(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: {value}")
+    if seconds < 0 or value.count(":") > 2:
+        raise argparse.ArgumentTypeError(f"invalid time: {value}")
+    return round(seconds * 1000)
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        from . import server  # Only needed for this mode
+        return server.main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Convert JSON/VTT/SRT subtitles. Run 'subconvert serve --help' for the HTTP server mode."
+    )
     parser.add_argument(
         "input_path",
-        help="Path to the input file or directory."
+        help="Path to the input file, directory, or .zip/.tar(.gz) archive (read without extracting)."
     )
     parser.add_argument(
         "-o", "--output",
         required=True,
         dest="output_dir",
-        help="Path to the output directory."
+        help="Path to the output directory, or a .zip/.tar(.gz) archive to write the outputs into."
     )
     parser.add_argument(
         "-f", "--format",
-        choices=["json", "vtt"],
+        choices=["json", "vtt", "srt", "auto"],
         default="json",
         dest="input_format",
-        help="Input file format (default: json)."
+        help="Input file format, or 'auto' to detect it per file from its content (default: json)."
+    )
+    
+    parser.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="Also convert files in sub-folders, mirroring the folder tree in the output."
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only convert files matching this glob (repeatable, e.g. 'en/*.json')."
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files and folders matching this glob (repeatable)."
     )
     
     # Output formats
@@ -27,6 +89,74 @@ def main():
     parser.add_argument("--vtt", dest="export_vtt", action="store_true", help="Export to VTT")
     parser.add_argument("--txt", dest="export_txt", action="store_true", help="Export to TXT")
     parser.add_argument("--json", dest="export_json", action="store_true", help="Export to JSON")
+    parser.add_argument(
+        "--json-style",
+        choices=["pretty", "compact"],
+        default="pretty",
+        help="Layout of JSON output: indented, or compact on one line (default: pretty)."
+    )
+
+    # Cue transforms (applied in one pass between parsing and writing)
+    parser.add_argument(
+        "--from",
+        type=_time_ms,
+        dest="clip_start_ms",
+        metavar="TIME",
+        help="Only keep cues on screen from TIME on (seconds, MM:SS or HH:MM:SS.mmm)."
+    )
+    parser.add_argument(
+        "--to",
+        type=_time_ms,
+        dest="clip_end_ms",
+        metavar="TIME",
+        help="Only keep cues on screen before TIME; parsing stops once past it."
+    )
+    parser.add_argument(
+        "--rebase",
+        action="store_true",
+        dest="clip_rebase",
+        help="Make --from the new zero, e.g. for a clip cut from the video."
+    )
+    parser.add_argument(
+        "--shift",
+        type=int,
+        default=0,
+        dest="shift_ms",
+        metavar="MS",
+        help="Move every cue by MS milliseconds (negative for earlier)."
+    )
+    parser.add_argument(
+        "--scale",
+        type=_factor,
+        default=1.0,
+        metavar="FACTOR",
+        help="Multiply every timestamp by FACTOR, e.g. 1.001 or 25/23.976 (applied before --shift)."
+    )
+    parser.add_argument(
+        "--merge",
+        type=int,
+        dest="merge_gap_ms",
+        metavar="GAP_MS",
+        help="Merge consecutive cues at most GAP_MS apart, up to --max-line-length x --max-lines "
+             f"characters (default {transforms.MERGE_MAX_CHARS})."
+    )
+    parser.add_argument(
+        "--max-line-length",
+        type=int,
+        metavar="N",
+        help="Re-wrap lines longer than N characters at word boundaries."
+    )
+    parser.add_argument(
+        "--max-lines",
+        type=int,
+        metavar="N",
+        help="Split cues with more than N lines into several cues."
+    )
+    parser.add_argument(
+        "--fix-overlaps",
+        action="store_true",
+        help="End each cue no later than the next one starts."
+    )
 
     # Naming
     parser.add_argument(
@@ -54,9 +184,81 @@ def main():
         action="store_true",
         help="Save each format in its own sub-folder."
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        dest="streaming",
+        help="Stream cues straight to the output files (constant memory)."
+    )
+    parser.add_argument(
+        "--json-decoder",
+        choices=["auto", *decoders.JSON_DECODERS],
+        default="auto",
+        help="Backend for decoding JSON input: 'auto' uses orjson or simdjson if installed "
+             "(stdlib when streaming or with --to), 'stdlib' decodes incrementally with constant memory (default: auto)."
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="Flush the outputs to disk before publishing them, one group of files at a time (slower, crash-safe)."
+    )
+    parser.add_argument(
+        "-i", "--incremental",
+        action="store_true",
+        help="Only convert files that changed since the last run (uses a manifest in the output directory)."
+    )
+    parser.add_argument(
+        "--async",
+        action="store_true",
+        dest="use_async",
+        help="Overlap file reads/writes with asyncio (for slow or network storage)."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Files read/written at once in --async mode (default: 16)."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        dest="workers",
+        help="Number of files to convert in parallel (default: 1)."
+    )
+    
+    # Diagnostics
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-stage timings, throughput and the slowest files at the end."
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="subconvert.prof",
+        metavar="FILE",
+        help="Run under cProfile and dump the stats to FILE (default: subconvert.prof). "
+             "With -j, only the main process is profiled."
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
+    for option, value in (
+        ("--max-line-length", args.max_line_length),
+        ("--max-lines", args.max_lines),
+        ("--concurrency", args.concurrency),
+        ("-j/--jobs", args.workers),
+    ):
+        if value is not None and value < 1:
+            parser.error(f"{option} must be at least 1")
+
+    if args.clip_start_ms is not None and args.clip_end_ms is not None and args.clip_end_ms <= args.clip_start_ms:
+        parser.error("--to must be later than --from")
+
+    if args.json_decoder != "auto" and args.json_decoder not in decoders.available_json_decoders():
+        parser.error(f"JSON decoder '{args.json_decoder}' is not installed")
+
     # --- Build the config object for the processor ---
     config = vars(args) # Convert argparse.Namespace to dict
     
@@ -73,14 +275,35 @@ def main():
         percent = (current / total) * 100
         print(f"[{percent:3.0f}%] {message}")
 
+    collector = MetricsCollector() if args.stats else None
+
+    def run():
+        if config["use_async"]:
+            asyncio.run(processor.run_conversion_async(config, cli_progress, collector))
+        else:
+            processor.run_conversion(config, cli_progress, collector)
+
     # --- Run the conversion ---
     try:
         print(f"Starting conversion...")
-        processor.run_conversion(config, cli_progress)
+        if args.profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(run)
+            finally:
+                profiler.dump_stats(args.profile)
+                print(f"\nProfile written to {args.profile}")
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+        else:
+            run()
         print("Done.")
     except Exception as e:
         print(f"\nError: {str(e)}")
         parser.print_help()
 
+    if collector is not None:
+        print()
+        print(collector.format_summary())
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+import codecs
+from . import formats
+
+try:
+    import orjson
+except ImportError:  # Optional: decodes whole JSON documents in C
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:  # Optional: pysimdjson, lazily materialised documents
+    simdjson = None
+
+# Backends that decode the events of a YouTube JSON document, fastest
+# first (as measured by bench.bench_json_decoders); "auto" picks the first
+# one that is installed. simdjson parses far faster than orjson, but every
+# field read through its proxies costs more than orjson's whole tree.
+JSON_DECODERS = ("orjson", "simdjson", "stdlib")
+
+class _BufferReader:
+    """Read-only text file over a UTF-8 buffer, decoding one slice per read()"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.pos = 0
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def read(self, size=-1):
+        end = len(self.buffer) if size < 0 else self.pos + size
+        chunk = self.buffer[self.pos:end]
+        self.pos += len(chunk)
+        return self.decoder.decode(chunk, final=self.pos >= len(self.buffer))
+
+def _without_bom(buffer):
+    """The buffer minus a leading UTF-8 byte order mark (a zero-copy view if there is one)"""
+    if buffer[:3] == codecs.BOM_UTF8:
+        return memoryview(buffer)[3:]
+    return buffer
+
+def _events_stdlib(buffer):
+    """Decode one event at a time with the json module (constant memory)"""
+    return formats.iter_json_events(_BufferReader(buffer))
+
+def _events_orjson(buffer):
+    """Decode the whole document with orjson and return its events"""
+    data = orjson.loads(memoryview(buffer))
+    if not isinstance(data, dict):
+        raise ValueError("Invalid JSON: expected an object at the top level")
+    return data.get("events", [])
+
+def _events_simdjson(buffer):
+    """
+    Parse the document with simdjson and yield its events as lazy proxies.
+    Only the fields iter_json_cues reads (tStartMs, dDurationMs, aAppend
+    and segs[].utf8) are ever turned into Python objects; window, pen and
+    ASR metadata is skipped over in the parsed tape.
+    """
+    # One parser per document: a parser can't be reused while proxies into
+    # its previous document are alive
+    document = simdjson.Parser().parse(buffer)
+    if not isinstance(document, simdjson.Object):
+        raise ValueError("Invalid JSON: expected an object at the top level")
+    events = document.get("events")
+    if events is not None:
+        yield from events
+
+_BACKENDS = {
+    "orjson": _events_orjson,
+    "simdjson": _events_simdjson,
+    "stdlib": _events_stdlib,
+}
+
+def available_json_decoders():
+    """Names of the JSON decoders that can be used here, fastest first"""
+    modules = {"orjson": orjson, "simdjson": simdjson}
+    return [name for name in JSON_DECODERS if modules.get(name, True) is not None]
+
+def resolve_json_decoder(name="auto"):
+    """
+    The backend name to use for a requested decoder: "auto" is the fastest
+    installed one. Raises ValueError for unknown or missing backends.
+    """
+    if name == "auto":
+        return available_json_decoders()[0]
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON decoder: {name}")
+    if name not in available_json_decoders():
+        raise ValueError(f"JSON decoder '{name}' is not installed")
+    return name
+
+def iter_json_buffer_events(buffer, decoder="auto"):
+    """
+    Yield the events of a YouTube JSON document held in a UTF-8 bytes-like
+    buffer (bytes or an mmap), using the given decoder backend.
+
+    "stdlib" decodes incrementally and keeps memory flat; "orjson" and
+    "simdjson" parse the whole document at once and are faster.
+    """
+    return _BACKENDS[resolve_json_decoder(decoder)](_without_bom(buffer))
@@ -1,23 +1,67 @@
+import codecs
+import io
+import json
+import json.encoder
 import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from itertools import accumulate, islice
 
-def ms_to_srt_time(ms):
-    """Convert milliseconds to SRT format time (HH:MM:SS,MMM)"""
+try:
+    import numpy
+except ImportError:  # Optional: only used to speed up the batch timestamp helpers
+    numpy = None
+
+@lru_cache(maxsize=8192, typed=True)
+def _timestamp_pair(ms):
+    """
+    (SRT, VTT) strings for one millisecond value. Memoised in a bounded
+    cache because cue boundaries repeat constantly (one cue's end is
+    usually the next cue's start).
+    """
     hours, ms = divmod(ms, 3600000)
     minutes, ms = divmod(ms, 60000)
     seconds, ms = divmod(ms, 1000)
-    return f"{hours:02}:{minutes:02}:{seconds:02},{ms:03}"
+    base = f"{hours:02}:{minutes:02}:{seconds:02}"
+    return f"{base},{ms:03}", f"{base}.{ms:03}"
+
+def ms_to_srt_time(ms):
+    """Convert milliseconds to SRT format time (HH:MM:SS,MMM)"""
+    return _timestamp_pair(ms)[0]
 
 def ms_to_vtt_time(ms):
     """Convert milliseconds to VTT format time (HH:MM:SS.MMM)"""
-    hours, ms = divmod(ms, 3600000)
-    minutes, ms = divmod(ms, 60000)
-    seconds, ms = divmod(ms, 1000)
-    return f"{hours:02}:{minutes:02}:{seconds:02}.{ms:03}"
+    return _timestamp_pair(ms)[1]
+
+# Lookup tables for the fixed-width timestamp fields, pre-scaled to milliseconds
+_HOURS_MS = {f"{i:02}": i * 3600000 for i in range(100)}
+_MINUTES_MS = {f"{i:02}": i * 60000 for i in range(100)}
+_SECONDS_MS = {f"{i:02}": i * 1000 for i in range(100)}
+_MILLIS = {f"{i:03}": i for i in range(1000)}
 
 def time_to_ms(time_str):
-    """Convert time string to milliseconds (handles SRT/VTT)"""
+    """Convert time string to milliseconds (handles SRT/VTT, with or without hours)"""
+    # Fast path for the fixed-width forms HH:MM:SS.mmm and MM:SS.mmm
+    try:
+        length = len(time_str)
+        if length == 12 and time_str[2] == ":" and time_str[5] == ":":
+            return (
+                _HOURS_MS[time_str[0:2]]
+                + _MINUTES_MS[time_str[3:5]]
+                + _SECONDS_MS[time_str[6:8]]
+                + _MILLIS[time_str[9:12]]
+            )
+        if length == 9 and time_str[2] == ":":
+            return _MINUTES_MS[time_str[0:2]] + _SECONDS_MS[time_str[3:5]] + _MILLIS[time_str[6:9]]
+    except KeyError:
+        pass  # Not plain digits; let the general parser handle (or reject) it
+
     time_str = time_str.replace(",", ".")
     parts = time_str.split(":")
+    if len(parts) == 2:
+        parts.insert(0, "0")
     hours = int(parts[0])
     minutes = int(parts[1])
     sec_parts = parts[2].split(".")
@@ -25,88 +69,888 @@ def time_to_ms(time_str):
     milliseconds = int(sec_parts[1]) if len(sec_parts) > 1 else 0
     return hours * 3600000 + minutes * 60000 + seconds * 1000 + milliseconds
 
-def convert_json_to_subtitles(data):
-    """Converts the YouTube JSON structure to an internal list format"""
-    subtitles = []
-    for event in data.get("events", []):
-        if "segs" not in event or not event["segs"]:
+# Zero-padded field strings for the pure-Python batch encoder
+_TWO_DIGITS = [f"{i:02}" for i in range(100)]
+_THREE_DIGITS = [f"{i:03}" for i in range(1000)]
+# Timestamps from 100 hours up don't fit the fixed-width HH:MM:SS.mmm layout
+_MAX_FIXED_MS = 100 * 3600000
+# Below this many values the NumPy set-up cost outweighs the gain
+NUMPY_BATCH_MIN = 256
+
+def _ms_to_times_numpy(values, separator):
+    """NumPy batch encoder; returns None when the input doesn't suit it"""
+    if isinstance(values, array) and values.typecode == "q":
+        ms = numpy.frombuffer(values, dtype=numpy.int64)
+    else:
+        ms = numpy.asarray(values)
+        if ms.dtype.kind not in "iu":
+            return None
+        ms = ms.astype(numpy.int64, copy=False)
+    if ms.ndim != 1 or ms.min() < 0 or ms.max() >= _MAX_FIXED_MS:
+        return None
+
+    hours, ms = numpy.divmod(ms, 3600000)
+    minutes, ms = numpy.divmod(ms, 60000)
+    seconds, ms = numpy.divmod(ms, 1000)
+    chars = numpy.empty((len(ms), 12), dtype=numpy.uint8)
+    for column, field, width in ((0, hours, 2), (3, minutes, 2), (6, seconds, 2), (9, ms, 3)):
+        for digit in range(width - 1, -1, -1):
+            field, chars[:, column + digit] = numpy.divmod(field, 10)
+    chars[:, [0, 1, 3, 4, 6, 7, 9, 10, 11]] += ord("0")
+    chars[:, 2] = chars[:, 5] = ord(":")
+    chars[:, 8] = ord(separator)
+    text = chars.tobytes().decode("ascii")
+    return [text[i:i + 12] for i in range(0, len(text), 12)]
+
+def ms_to_times(values, separator):
+    """
+    Batch-encode a column of millisecond values (list, array('q') or NumPy
+    array) to HH:MM:SS<separator>mmm strings. Uses NumPy for large batches
+    when it is installed, otherwise lookup tables for the digit fields.
+    """
+    if numpy is not None and len(values) >= NUMPY_BATCH_MIN:
+        encoded = _ms_to_times_numpy(values, separator)
+        if encoded is not None:
+            return encoded
+
+    two, three = _TWO_DIGITS, _THREE_DIGITS
+    encoded = []
+    for ms in values:
+        if type(ms) is int and 0 <= ms < _MAX_FIXED_MS:
+            hours, rest = divmod(ms, 3600000)
+            minutes, rest = divmod(rest, 60000)
+            seconds, rest = divmod(rest, 1000)
+            encoded.append(f"{two[hours]}:{two[minutes]}:{two[seconds]}{separator}{three[rest]}")
+        else:
+            encoded.append(_timestamp_pair(ms)[0 if separator == "," else 1])
+    return encoded
+
+def ms_to_srt_times(values):
+    """Batch version of ms_to_srt_time"""
+    return ms_to_times(values, ",")
+
+def ms_to_vtt_times(values):
+    """Batch version of ms_to_vtt_time"""
+    return ms_to_times(values, ".")
+
+def _times_to_ms_numpy(time_strs):
+    """NumPy batch decoder for HH:MM:SS.mmm strings; returns None when they don't all fit"""
+    count = len(time_strs)
+    # Every string must be 12 characters wide: a matching total alone would
+    # let a short and a long value shift the rows out of alignment
+    if set(map(len, time_strs)) != {12}:
+        return None
+    try:
+        data = "".join(time_strs).encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    chars = numpy.frombuffer(data, dtype=numpy.uint8).reshape(count, 12).astype(numpy.int64)
+    digits = chars[:, [0, 1, 3, 4, 6, 7, 9, 10, 11]] - ord("0")
+    if (
+        (digits < 0).any() or (digits > 9).any()
+        or (chars[:, 2] != ord(":")).any() or (chars[:, 5] != ord(":")).any()
+        or ((chars[:, 8] != ord(".")) & (chars[:, 8] != ord(","))).any()
+    ):
+        return None
+    weights = numpy.array([36000000, 3600000, 600000, 60000, 10000, 1000, 100, 10, 1], dtype=numpy.int64)
+    return (digits @ weights).tolist()
+
+def times_to_ms(time_strs):
+    """
+    Batch version of time_to_ms: decode a sequence of SRT/VTT timestamp
+    strings to a list of milliseconds. Uses NumPy for large batches of
+    fixed-width HH:MM:SS.mmm values when it is installed.
+    """
+    if numpy is not None and len(time_strs) >= NUMPY_BATCH_MIN:
+        decoded = _times_to_ms_numpy(time_strs)
+        if decoded is not None:
+            return decoded
+    return [time_to_ms(time_str) for time_str in time_strs]
+
+def iter_json_cues(events):
+    """
+    Merge YouTube JSON events into subtitle dictionaries, yielding each one
+    as soon as it is complete (i.e. when the next non-aAppend event starts).
+    """
+    pending = None
+    for event in events:
+        segs = event.get("segs")
+        if not segs:
             continue
         try:
             start = event.get("tStartMs", 0)
             duration = event.get("dDurationMs", 0)
             end = start + duration
-            text = "".join(seg.get("utf8", "") for seg in event["segs"])
-
-            if event.get("aAppend") == 1 and subtitles:
-                last_sub = subtitles[-1]
-                last_sub["text"] += text
-                last_sub["end"] = end
-            else:
-                subtitles.append({"start": start, "end": end, "text": text})
+            if type(start) is not int or type(end) is not int:
+                start, end = round(start), round(end)  # Some exports write 1000.0
+            text = "".join(seg.get("utf8", "") for seg in segs)
         except KeyError as e:
             print(f"Skipping invalid event: Missing key {e}")
             continue
-    return subtitles
+
+        if event.get("aAppend") == 1 and pending is not None:
+            pending["text"] += text
+            pending["end"] = end
+        else:
+            if pending is not None:
+                yield pending
+            pending = {"start": start, "end": end, "text": text}
+
+    if pending is not None:
+        yield pending
+
+def convert_json_to_subtitles(data):
+    """Converts the YouTube JSON structure to an internal list format"""
+    return list(iter_json_cues(data.get("events", [])))
+
+class _JsonStream:
+    """Minimal pull reader that decodes one JSON value at a time from a file"""
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read more data into the buffer, returning False at end of file"""
+        if self.eof:
+            return False
+        # Grow reads with the unconsumed tail so a huge value is not re-scanned
+        # once per chunk.
+        chunk = self.fp.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character ('' at end of file)"""
+        while True:
+            self.pos = _JSON_WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON: expected '{char}', found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may have been cut off
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+_JSON_DECODER = json.JSONDecoder()
+
+def iter_json_events(fp, chunk_size=65536):
+    """
+    Incrementally yield the items of the top-level "events" array from a
+    YouTube JSON file handle, decoding one event at a time. Other top-level
+    keys are decoded and discarded.
+    """
+    stream = _JsonStream(fp, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        stream.pos += 1
+    else:
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "events" and stream.peek() == "[":
+                stream.pos += 1
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        found = stream.peek()
+                        stream.pos += 1
+                        if found == "]":
+                            break
+                        if found != ",":
+                            raise ValueError(f"Invalid JSON: expected ',' or ']', found {found!r}")
+            elif key == "events":
+                yield from stream.value()
+            else:
+                stream.value()
+
+            found = stream.peek()
+            stream.pos += 1
+            if found == "}":
+                break
+            if found != ",":
+                raise ValueError(f"Invalid JSON: expected ',' or '}}', found {found!r}")
+
+    if stream.peek():
+        raise ValueError("Invalid JSON: extra data after the top-level object")
+
+# Timing line: start --> end, optionally followed by cue settings
+_VTT_TIMESTAMP = r"(\d+:\d\d(?::\d\d)?[.,]\d+)"
+_VTT_TIMING = re.compile(r"[ \t]*" + _VTT_TIMESTAMP + r"[ \t]+-->[ \t]+" + _VTT_TIMESTAMP)
+# Blocks that are not cues (the keyword must be followed by whitespace or end the line)
+_VTT_SKIP_BLOCK = re.compile(r"(?:NOTE|STYLE|REGION)(?:[ \t]|$)")
+
+def _split_timing(timing_line):
+    """Return the (start, end) timestamp strings of a "start --> end" line, or None"""
+    if timing_line[12:17] == " --> " and timing_line[29:30] in ("", " ", "\t"):
+        # Common fixed-width "HH:MM:SS.mmm --> HH:MM:SS.mmm" line
+        return timing_line[0:12], timing_line[17:29]
+    timing_match = _VTT_TIMING.match(timing_line)
+    if not timing_match:
+        return None
+    return timing_match.groups()
+
+def _vtt_block_fields(block, is_first):
+    """Split one VTT block into (start string, end string, text), or None"""
+    if is_first and block[0].startswith("WEBVTT"):
+        # The header normally ends at the first blank line, but tolerate a
+        # cue that follows it directly.
+        for i in range(1, len(block)):
+            if "-->" in block[i]:
+                return _vtt_block_fields(block[i:], False)
+        return None
+
+    if "-->" in block[0]:
+        timing_idx = 0
+    elif len(block) > 1 and "-->" in block[1]:
+        timing_idx = 1  # First line is the cue identifier
+    else:
+        return None  # NOTE/STYLE/REGION or stray text
+    if timing_idx and _VTT_SKIP_BLOCK.match(block[0]):
+        return None
+
+    times = _split_timing(block[timing_idx])
+    if times is None:
+        return None
+    return times[0], times[1], "\n".join(block[timing_idx + 1:]).rstrip()
+
+def _decode_cue_fields(pending):
+    """
+    Decode the timestamps of a batch of split cues into subtitle
+    dictionaries. Cues with no text (a timing line followed by a blank
+    line) are dropped, as they would be written out as empty cues.
+    """
+    if not all(fields[2] for fields in pending):
+        pending = [fields for fields in pending if fields[2]]
+    try:
+        times = times_to_ms([field for fields in pending for field in fields[:2]])
+    except (ValueError, IndexError):
+        # Some timestamp is malformed: decode one cue at a time and skip it
+        for start_time, end_time, text in pending:
+            try:
+                yield {"start": time_to_ms(start_time), "end": time_to_ms(end_time), "text": text}
+            except (ValueError, IndexError):
+                continue
+        return
+    for i, (_, _, text) in enumerate(pending):
+        yield {"start": times[2 * i], "end": times[2 * i + 1], "text": text}
+
+def iter_vtt_cues(lines, batch_size=1024):
+    """
+    Parse WebVTT from an iterable of lines (e.g. an open file) in a single
+    pass, yielding subtitle dictionaries. Cue settings are ignored,
+    NOTE/STYLE/REGION blocks are skipped, and timestamps may omit the hours
+    (MM:SS.mmm). Timestamps are decoded batch_size cues at a time.
+    """
+    block = []
+    pending = []
+    is_first = True
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line:
+            if block:
+                block.append(line)
+            elif not line.isspace():
+                if is_first and line.startswith("\ufeff"):
+                    line = line[1:]
+                block.append(line)
+            continue
+        if block:
+            fields = _vtt_block_fields(block, is_first)
+            if fields is not None:
+                pending.append(fields)
+                if len(pending) >= batch_size:
+                    yield from _decode_cue_fields(pending)
+                    pending = []
+            block = []
+            is_first = False
+
+    if block:
+        fields = _vtt_block_fields(block, is_first)
+        if fields is not None:
+            pending.append(fields)
+    yield from _decode_cue_fields(pending)
 
 def parse_vtt(vtt_content):
     """Parse WebVTT format into a list of subtitle dictionaries"""
-    subtitles = []
-    vtt_content = vtt_content.replace("\r\n", "\n")
-    if vtt_content.strip().startswith("WEBVTT"):
-        vtt_content = re.sub(r"^WEBVTT.*?\n\n", "", vtt_content, flags=re.DOTALL)
-
-    cue_blocks = re.split(r"\n\n+", vtt_content.strip())
-    for block in cue_blocks:
-        lines = block.strip().split("\n")
-        if len(lines) < 2:
-            continue
-        timing_line_idx = next(
-            (i for i, line in enumerate(lines) if "-->" in line), -1
-        )
-        if timing_line_idx == -1:
-            continue
-        timing_match = re.search(
-            r"(\d+:\d+:\d+\.\d+)\s+-->\s+(\d+:\d+:\d+\.\d+)", lines[timing_line_idx]
-        )
-        if not timing_match:
+    return list(iter_vtt_cues(io.StringIO(vtt_content)))
+
+def iter_srt_cues(lines, batch_size=1024):
+    """
+    Parse SRT from an iterable of lines (e.g. an open file) in a single
+    pass, yielding subtitle dictionaries. A cue is a timing line followed by
+    its text up to the next blank line; the index line before it is
+    optional. Extra blank lines, CRLF line endings, a leading BOM, a missing
+    blank line between cues and trailing coordinates on the timing line are
+    all tolerated. Cues with unreadable timings are skipped.
+    """
+    pending = []
+    cue = None  # [start string, end string, text lines] of the cue being read
+    in_text = False  # Inside a cue's text (no blank line since its timing line)
+    is_first = True
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if is_first:
+            if line.startswith("\ufeff"):
+                line = line[1:]
+            is_first = False
+
+        if "-->" in line:
+            times = _split_timing(line)
+            if in_text and cue is not None and cue[2] and cue[2][-1].strip().isdigit():
+                cue[2].pop()  # No blank line before this cue: that was its index
+            if cue is not None:
+                pending.append((cue[0], cue[1], "\n".join(cue[2]).rstrip()))
+                if len(pending) >= batch_size:
+                    yield from _decode_cue_fields(pending)
+                    pending = []
+            cue = [times[0], times[1], []] if times is not None else None
+            in_text = True
+        elif not line or line.isspace():
+            in_text = False
+        elif in_text and cue is not None:
+            cue[2].append(line)
+        # Anything else is an index line or stray text between cues
+
+    if cue is not None:
+        pending.append((cue[0], cue[1], "\n".join(cue[2]).rstrip()))
+    yield from _decode_cue_fields(pending)
+
+def parse_srt(srt_content):
+    """Parse SRT format into a list of subtitle dictionaries"""
+    return list(iter_srt_cues(io.StringIO(srt_content)))
+
+# Cue scanners for raw UTF-8 buffers (bytes, mmap). The regex runs over the
+# buffer in place, so only each cue's timestamps and text are copied out
+# and decoded. A UTF-8 BOM may precede the first timing line.
+_BYTES_TIMESTAMP = _VTT_TIMESTAMP.encode("ascii")
+_BYTES_TIMING = (
+    rb"^(?:\xef\xbb\xbf)?[ \t]*" + _BYTES_TIMESTAMP + rb"[ \t]+-->[ \t]+" + _BYTES_TIMESTAMP + rb"[^\n]*(?:\n|\Z)"
+)
+# VTT cue text runs up to the next empty line
+_VTT_CUE_BYTES = re.compile(_BYTES_TIMING + rb"((?:(?!\r?(?:\n|\Z))[^\n]*(?:\n|\Z))*)", re.M)
+# SRT cue text runs up to the next blank line, timing line, or index line
+# directly followed by a timing line
+_SRT_CUE_BYTES = re.compile(
+    _BYTES_TIMING
+    + rb"((?:(?![^\n]*-->)(?![ \t]*\d+[ \t]*\r?\n[^\n]*-->)[^\S\n]*\S[^\n]*(?:\n|\Z))*)",
+    re.M,
+)
+
+def _scan_cues(pattern, buffer, batch_size, start_ms=None):
+    """
+    Yield subtitle dictionaries for every cue the pattern finds in a UTF-8
+    buffer, from near start_ms on if given (see _seek_offset)
+    """
+    pos = 0 if start_ms is None else _seek_offset(buffer, start_ms)
+    pending = []
+    for match in pattern.finditer(buffer, pos):
+        start_time, end_time, text = match.groups()
+        pending.append((
+            start_time.decode("ascii"),
+            end_time.decode("ascii"),
+            text.decode("utf-8").replace("\r\n", "\n").rstrip(),
+        ))
+        if len(pending) >= batch_size:
+            yield from _decode_cue_fields(pending)
+            pending = []
+    yield from _decode_cue_fields(pending)
+
+# A timing line on its own, for seeking in a buffer
+_TIMING_LINE = re.compile(_BYTES_TIMING, re.M)
+# Below this many bytes, seeking stops bisecting and the scan takes over
+_SEEK_SPAN = 1 << 16
+# How far before the window seeking looks for cues still on screen: a cue
+# that started longer ago than this is assumed to have ended
+SEEK_LOOKBACK_MS = 60 * 60 * 1000
+
+def _seek_offset(buffer, start_ms):
+    """
+    Byte offset to scan a buffer of cues in time order from so that every
+    cue on screen at start_ms or later is found (0 if there is nothing to
+    skip). The cues starting well before start_ms are skipped by bisecting.
+    From there, the timing lines are read backwards, a piece at a time, to
+    back up to the first cue still showing; this stops at the cues starting
+    SEEK_LOOKBACK_MS before start_ms, so only that stretch of the file is read.
+    """
+    lo, hi = 0, len(buffer)
+    while hi - lo > _SEEK_SPAN:
+        mid = (lo + hi) // 2
+        match = _TIMING_LINE.search(buffer, mid, hi)
+        if match is not None and time_to_ms(match.group(1).decode("ascii")) < start_ms:
+            lo = match.start()
+        else:
+            hi = mid
+    if not lo:
+        return 0
+
+    floor = start_ms - SEEK_LOOKBACK_MS
+    offset = stop = lo
+    while stop:
+        # Pieces start on a line, so no timing line is cut in two
+        begin = buffer.rfind(b"\n", 0, max(stop - _SEEK_SPAN, 0)) + 1
+        lines = list(_TIMING_LINE.finditer(buffer, begin, stop))
+        stop = begin
+        if not lines:
             continue
-        start_time, end_time = timing_match.groups()
-        start_ms = time_to_ms(start_time)
-        end_ms = time_to_ms(end_time)
-        text = "\n".join(lines[timing_line_idx + 1 :])
-        subtitles.append({"start": start_ms, "end": end_ms, "text": text})
-    return subtitles
+        times = times_to_ms([stamp.decode("ascii") for match in lines for stamp in match.group(1, 2)])
+        showing = next((match for match, end in zip(lines, times[1::2]) if end > start_ms), None)
+        if showing is not None:
+            offset = showing.start()
+        if times[0] <= floor:
+            break
+    return offset
+
+def _has_lone_cr_newlines(buffer):
+    """True for classic Mac OS files, whose lines end in a bare CR"""
+    head = buffer[:65536]
+    return b"\n" not in head and b"\r" in head
+
+# Validated in pieces of this size, so no decoded copy of a large file is held
+_CHECK_CHUNK = 1 << 22
+
+def _check_utf8(buffer):
+    """
+    Raise unless a buffer is UTF-8 throughout: UnicodeDecodeError for
+    invalid bytes anywhere (not only in cue text, which is all the scanner
+    decodes), ValueError for UTF-16/32 text, whose NUL bytes are valid
+    UTF-8 but would match no cues
+    """
+    if b"\x00" in buffer[:4096]:
+        raise ValueError("File is not UTF-8 text (UTF-16 or UTF-32?)")
+    view = memoryview(buffer)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for pos in range(0, len(view), _CHECK_CHUNK):
+        decoder.decode(view[pos:pos + _CHECK_CHUNK])
+    decoder.decode(b"", final=True)
+
+def iter_vtt_cues_bytes(buffer, batch_size=1024, start_ms=None):
+    """
+    Parse WebVTT from a UTF-8 bytes-like buffer such as an mmap, without
+    decoding it as a whole: cues are found by scanning the bytes and only
+    their text is decoded. The buffer is checked to be UTF-8 first (see
+    _check_utf8). Header, NOTE/STYLE/REGION blocks and cue identifiers are
+    skipped over.
+
+    With start_ms, a file in time order is bisected for that time and the
+    text of the cues that ended before it is never scanned; some of the
+    cues yielded may still end before start_ms (clip_cues drops them).
+    """
+    _check_utf8(buffer)
+    if _has_lone_cr_newlines(buffer):
+        return iter_vtt_cues(io.TextIOWrapper(io.BytesIO(buffer), encoding="utf-8"), batch_size)
+    return _scan_cues(_VTT_CUE_BYTES, buffer, batch_size, start_ms)
+
+def iter_srt_cues_bytes(buffer, batch_size=1024, start_ms=None):
+    """Parse SRT from a UTF-8 bytes-like buffer such as an mmap (see iter_vtt_cues_bytes)"""
+    _check_utf8(buffer)
+    if _has_lone_cr_newlines(buffer):
+        return iter_srt_cues(io.TextIOWrapper(io.BytesIO(buffer), encoding="utf-8"), batch_size)
+    return _scan_cues(_SRT_CUE_BYTES, buffer, batch_size, start_ms)
+
+# Optional index line followed by a timing line
+_SRT_START = re.compile(r"(?:\d+[ \t]*\r?\n)?" + _VTT_TIMING.pattern)
+
+def sniff_format(head):
+    """
+    Guess the input format from the first few hundred characters of a file:
+    "vtt" for a WEBVTT header, "json" for a JSON object and "srt" for an
+    index or timing line. Returns None if it looks like none of them.
+    """
+    head = head.lstrip("\ufeff \t\r\n")
+    if head.startswith("WEBVTT"):
+        return "vtt"
+    if head.startswith("{"):
+        return "json"
+    if _SRT_START.match(head):
+        return "srt"
+    return None
+
+class CueTable:
+    """
+    Compact column store for subtitles. Start/end times live in array('q')
+    columns and all cue text is kept in one UTF-8 buffer addressed by an
+    offsets array, so there is no dict per cue.
+
+    Iterating a CueTable yields the usual {"start", "end", "text"}
+    dictionaries; use rows() for cheaper (start, end, text) tuples.
+    """
+
+    __slots__ = ("starts", "ends", "offsets", "text_buffer")
+
+    def __init__(self):
+        self.starts = array("q")
+        self.ends = array("q")
+        self.offsets = array("q", [0])
+        self.text_buffer = bytearray()
+
+    @classmethod
+    def from_cues(cls, cues):
+        """Build a table from any iterable of subtitle dictionaries"""
+        table = cls()
+        table.extend(cues)
+        return table
+
+    def __len__(self):
+        return len(self.starts)
+
+    def append(self, start, end, text):
+        if type(start) is not int or type(end) is not int:
+            start, end = round(start), round(end)  # The columns hold whole ms
+        self.starts.append(start)
+        self.ends.append(end)
+        self.text_buffer += text.encode("utf-8", "surrogatepass")
+        self.offsets.append(len(self.text_buffer))
+
+    def extend(self, cues):
+        append = self.append
+        for sub in cues:
+            append(sub["start"], sub["end"], sub["text"])
+
+    def text(self, index):
+        offsets = self.offsets
+        data = memoryview(self.text_buffer)[offsets[index]:offsets[index + 1]]
+        return str(data, "utf-8", "surrogatepass")
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return {"start": self.starts[index], "end": self.ends[index], "text": self.text(index)}
+
+    def rows(self):
+        """Yield (start, end, text) tuples in order"""
+        data = memoryview(self.text_buffer)
+        offsets = self.offsets
+        for i, (start, end) in enumerate(zip(self.starts, self.ends)):
+            yield start, end, str(data[offsets[i]:offsets[i + 1]], "utf-8", "surrogatepass")
+
+    def __iter__(self):
+        for start, end, text in self.rows():
+            yield {"start": start, "end": end, "text": text}
+
+class CueIndex:
+    """
+    Interval index over a CueTable for time-range queries.
+
+    Cue positions are kept ordered by start time (the table's own order
+    when it is already sorted, as parsed files usually are) next to a
+    running maximum of their end times. Both arrays are non-decreasing, so
+    the cues overlapping a window lie between two binary searches, however
+    much the cues overlap; only the cues in that range are checked.
+    """
+
+    __slots__ = ("table", "order", "starts", "max_ends")
+
+    def __init__(self, table):
+        self.table = table
+        starts = table.starts
+        if all(a <= b for a, b in zip(starts, islice(starts, 1, None))):
+            self.order = range(len(table))
+            self.starts = starts
+        else:
+            self.order = array("q", sorted(range(len(table)), key=starts.__getitem__))
+            self.starts = array("q", (starts[i] for i in self.order))
+        ends = table.ends
+        self.max_ends = array("q", accumulate((ends[i] for i in self.order), max))
+
+    def __len__(self):
+        return len(self.table)
+
+    def overlapping(self, start, end):
+        """
+        Table positions of the cues overlapping [start, end) in ms (ending
+        after start and starting before end), ordered by start time
+        """
+        ends = self.table.ends
+        order = self.order
+        lo = bisect_right(self.max_ends, start)
+        hi = bisect_left(self.starts, end)
+        return [order[i] for i in range(lo, hi) if ends[order[i]] > start]
+
+    def at(self, time):
+        """Table positions of the cues on screen at time (ms)"""
+        return self.overlapping(time, time + 1)
+
+    def clip(self, start=None, end=None, rebase=False):
+        """
+        A new CueTable with the cues overlapping [start, end), their times
+        cut to the window. With rebase the window's start becomes 0.
+        Either bound may be None for an open-ended window.
+        """
+        lo = 0 if start is None else start
+        hi = (self.max_ends[-1] if len(self) else 0) + 1 if end is None else end
+        table = self.table
+        return CueTable.from_cues(clip_cues((table[i] for i in self.overlapping(lo, hi)), start, end, rebase))
+
+def clip_cues(cues, start=None, end=None, rebase=False):
+    """
+    Keep the cues of a stream that overlap [start, end) ms, cutting their
+    times to the window (and moving the window's start to 0 with rebase).
+    Either bound may be None.
+
+    Cues are expected in start time order, as files store them: the first
+    cue starting at or after end stops the iteration, so the parser feeding
+    it stops reading there too.
+    """
+    offset = start if rebase and start else 0
+    for cue in cues:
+        if end is not None and cue["start"] >= end:
+            return
+        if start is not None:
+            if cue["end"] <= start:
+                continue
+            if cue["start"] < start:
+                cue["start"] = start
+        if end is not None and cue["end"] > end:
+            cue["end"] = end
+        if offset:
+            cue["start"] -= offset
+            cue["end"] -= offset
+        yield cue
+
+def iter_rows(subtitles):
+    """Yield (start, end, text) tuples from a CueTable or any iterable of subtitle dicts"""
+    if isinstance(subtitles, CueTable):
+        return subtitles.rows()
+    return ((sub["start"], sub["end"], sub["text"]) for sub in subtitles)
 
 def generate_srt(subtitles):
     """Generate SRT format subtitle content"""
     srt = []
-    for i, sub in enumerate(subtitles, 1):
-        start = ms_to_srt_time(sub["start"])
-        end = ms_to_srt_time(sub["end"])
-        srt.append(f"{i}\n{start} --> {end}\n{sub['text'].strip()}\n")
+    for i, (start, end, text) in enumerate(iter_rows(subtitles), 1):
+        srt.append(f"{i}\n{ms_to_srt_time(start)} --> {ms_to_srt_time(end)}\n{text.strip()}\n")
     return "\n".join(srt)
 
 def generate_vtt(subtitles):
     """Generate WebVTT format subtitle content"""
     vtt = ["WEBVTT\n"]
-    for i, sub in enumerate(subtitles, 1):
-        start = ms_to_vtt_time(sub["start"])
-        end = ms_to_vtt_time(sub["end"])
-        vtt.append(f"\n{i}\n{start} --> {end}\n{sub['text'].strip()}")
+    for i, (start, end, text) in enumerate(iter_rows(subtitles), 1):
+        vtt.append(f"\n{i}\n{ms_to_vtt_time(start)} --> {ms_to_vtt_time(end)}\n{text.strip()}")
     return "\n".join(vtt)
 
 def generate_plain_text(subtitles):
     """Generate plain text from subtitles"""
-    return " ".join(sub["text"].strip() for sub in subtitles)
+    return " ".join(text.strip() for _, _, text in iter_rows(subtitles))
+
+# Layouts for JSON output: indent=2 as json.dump writes it, or no whitespace at all
+JSON_STYLES = ("pretty", "compact")
 
 def generate_json(subtitles):
     """Generate simplified JSON format from subtitles"""
     events = []
-    for sub in subtitles:
+    for start, end, text in iter_rows(subtitles):
         event = {
-            "tStartMs": sub["start"],
-            "dDurationMs": sub["end"] - sub["start"],
-            "segs": [{"utf8": sub["text"]}],
+            "tStartMs": start,
+            "dDurationMs": end - start,
+            "segs": [{"utf8": text}],
         }
         events.append(event)
     return {"events": events}
+
+
+# One cue prepared for output by RenderContext. The srt_*/vtt_* timestamp
+# strings are None when no enabled writer needs them.
+RenderedCue = namedtuple(
+    "RenderedCue",
+    "index start end text stripped srt_start srt_end vtt_start vtt_end",
+)
+
+class SrtWriter:
+    """Writes SRT cues to an open text file as they arrive (see generate_srt)"""
+
+    needs_timestamps = True
+
+    def __init__(self, f):
+        self.f = f
+
+    def start(self):
+        pass
+
+    def write(self, cue):
+        prefix = "\n" if cue.index > 1 else ""
+        self.f.write(f"{prefix}{cue.index}\n{cue.srt_start} --> {cue.srt_end}\n{cue.stripped}\n")
+
+    def finish(self, count):
+        pass
+
+class VttWriter:
+    """Writes WebVTT cues to an open text file as they arrive (see generate_vtt)"""
+
+    needs_timestamps = True
+
+    def __init__(self, f):
+        self.f = f
+
+    def start(self):
+        self.f.write("WEBVTT\n")
+
+    def write(self, cue):
+        self.f.write(f"\n\n{cue.index}\n{cue.vtt_start} --> {cue.vtt_end}\n{cue.stripped}")
+
+    def finish(self, count):
+        pass
+
+class TextWriter:
+    """Writes plain text to an open text file as cues arrive (see generate_plain_text)"""
+
+    needs_timestamps = False
+
+    def __init__(self, f):
+        self.f = f
+
+    def start(self):
+        pass
+
+    def write(self, cue):
+        if cue.index > 1:
+            self.f.write(" ")
+        self.f.write(cue.stripped)
+
+    def finish(self, count):
+        pass
+
+class JsonWriter:
+    """
+    Writes the simplified JSON format to an open text file as cues arrive,
+    without building the generate_json tree. The "pretty" style is
+    identical to json.dump(generate_json(...), indent=2, ensure_ascii=False);
+    "compact" matches separators=(",", ":") instead.
+    """
+
+    needs_timestamps = False
+
+    def __init__(self, f, style="pretty"):
+        if style not in JSON_STYLES:
+            raise ValueError(f"Unknown JSON style: {style}")
+        self.f = f
+        self.compact = style == "compact"
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def start(self):
+        self.f.write('{"events":[' if self.compact else '{\n  "events": [')
+
+    def write(self, cue):
+        start, duration = cue.start, cue.end - cue.start
+        if type(start) is int and type(duration) is int:
+            start, duration = str(start), str(duration)
+        else:
+            start, duration = self._encode(start), self._encode(duration)
+        text = json.encoder.encode_basestring(cue.text)
+        prefix = "," if cue.index > 1 else ""
+        if self.compact:
+            self.f.write(f'{prefix}{{"tStartMs":{start},"dDurationMs":{duration},"segs":[{{"utf8":{text}}}]}}')
+            return
+        self.f.write(
+            f"{prefix}\n    {{\n"
+            f'      "tStartMs": {start},\n'
+            f'      "dDurationMs": {duration},\n'
+            f'      "segs": [\n        {{\n          "utf8": {text}\n        }}\n      ]\n'
+            f"    }}"
+        )
+
+    def finish(self, count):
+        if self.compact:
+            self.f.write("]}")
+        else:
+            self.f.write("\n  ]\n}" if count else "]\n}")
+
+# Output extension -> streaming writer class, in the order files are written
+WRITERS = {
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "txt": TextWriter,
+    "json": JsonWriter,
+}
+
+class RenderContext:
+    """
+    Prepares each cue once and shares it across all enabled writers: the
+    stripped text, and (only if some writer needs them) the SRT and VTT
+    timestamp strings. Timestamps are encoded a block of cues at a time
+    with the batch helpers rather than one value at a time.
+    """
+
+    block_size = 4096
+
+    def __init__(self, writers):
+        self.writers = writers
+        self.needs_timestamps = any(writer.needs_timestamps for writer in writers)
+
+    def run(self, subtitles):
+        """Feed every cue to all writers in a single pass; returns the cue count"""
+        writers = self.writers
+        make = RenderedCue._make
+        rows = iter(iter_rows(subtitles))
+        index = 0
+
+        for writer in writers:
+            writer.start()
+        while True:
+            block = list(islice(rows, self.block_size))
+            if not block:
+                break
+            starts, ends, texts = zip(*block)
+            if self.needs_timestamps:
+                vtt_starts = ms_to_vtt_times(starts)
+                vtt_ends = ms_to_vtt_times(ends)
+                srt_starts = [t.replace(".", ",") for t in vtt_starts]
+                srt_ends = [t.replace(".", ",") for t in vtt_ends]
+            else:
+                vtt_starts = vtt_ends = srt_starts = srt_ends = (None,) * len(block)
+            for start, end, text, srt_start, srt_end, vtt_start, vtt_end in zip(
+                starts, ends, texts, srt_starts, srt_ends, vtt_starts, vtt_ends
+            ):
+                index += 1
+                cue = make((index, start, end, text, text.strip(), srt_start, srt_end, vtt_start, vtt_end))
+                for writer in writers:
+                    writer.write(cue)
+        for writer in writers:
+            writer.finish(index)
+        return index
+
+def write_cues(subtitles, writers):
+    """Feed every cue to all writers in a single pass over the input; returns the cue count"""
+    return RenderContext(writers).run(subtitles)
+
+def make_writer(ext, f, json_style="pretty"):
+    """The streaming writer for one output format (by extension), writing to f"""
+    if ext == "json":
+        return JsonWriter(f, json_style)
+    return WRITERS[ext](f)
+
+def render_formats(subtitles, exts, json_style="pretty"):
+    """
+    Render several output formats (by extension) in one pass over the cues.
+    Returns {extension: text}.
+    """
+    buffers = {ext: io.StringIO() for ext in exts}
+    write_cues(subtitles, [make_writer(ext, buffers[ext], json_style) for ext in exts])
+    return {ext: buffer.getvalue() for ext, buffer in buffers.items()}
@@ -1,11 +1,76 @@
+import os
 import sys
+import threading
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot
 from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QGridLayout,
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QLabel, QLineEdit, QPushButton, QRadioButton, QComboBox,
-    QCheckBox, QFileDialog, QMessageBox, QProgressBar
+    QCheckBox, QFileDialog, QMessageBox, QProgressBar, QSpinBox
 )
 from . import processor  # Import our decoupled backend
 
+# How often (per second) progress may repaint the window during a batch
+UI_REFRESH_HZ = 20
+
+class ConversionWorker(QObject):
+    """
+    Runs processor.run_conversion on a QThread. Progress updates are only
+    recorded as they arrive; flush_progress() forwards the latest one as a
+    signal, and the window calls it from a timer UI_REFRESH_HZ times per
+    second (the worker's own thread is busy converting, so it can't run
+    the timer). Big batches don't flood the GUI thread with repaints, a
+    slow file after a fast one still shows up within one tick, and the
+    final update is always delivered.
+    """
+
+    progress = Signal(int, int, str)  # current, total, message
+    finished = Signal(str, list)      # final message, [(filename, error)]
+    failed = Signal(str)              # error that stopped the whole batch
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+        self.cancel_event = threading.Event()
+        self.errors = []
+        self._lock = threading.Lock()
+        self._latest = (0, 0, "")
+        self._pending = False
+
+    def cancel(self):
+        """Stop after the files in flight (safe to call from any thread)"""
+        self.cancel_event.set()
+
+    def _on_progress(self, current, total, message):
+        with self._lock:
+            self._latest = (current, total, message)
+            self._pending = True
+
+    def flush_progress(self):
+        """Emit the latest progress update if it hasn't been sent yet (call from the GUI thread)"""
+        with self._lock:
+            if not self._pending:
+                return
+            self._pending = False
+            latest = self._latest
+        self.progress.emit(*latest)
+
+    def _on_metrics(self, file_metrics):
+        if file_metrics["error"] is not None:
+            self.errors.append((os.path.basename(file_metrics["file"]), file_metrics["error"]))
+
+    @Slot()
+    def run(self):
+        try:
+            processor.run_conversion(self.config, self._on_progress, self._on_metrics, self.cancel_event)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        with self._lock:
+            self._pending = False
+            latest = self._latest
+        self.progress.emit(*latest)
+        self.finished.emit(latest[2], self.errors)
+
 class PySideConverterApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -30,7 +95,7 @@ class PySideConverterApp(QMainWindow):
         layout.addWidget(self.input_path_entry, 1, 1)
         self.browse_input_btn = QPushButton("Browse"); layout.addWidget(self.browse_input_btn, 1, 2)
         layout.addWidget(QLabel("Input Format:"), 2, 0)
-        self.input_format_combo = QComboBox(); self.input_format_combo.addItems(["json", "vtt"])
+        self.input_format_combo = QComboBox(); self.input_format_combo.addItems(["json", "vtt", "srt", "auto"])
         layout.addWidget(self.input_format_combo, 2, 1)
         main_layout.addWidget(input_group)
 
@@ -63,11 +128,18 @@ class PySideConverterApp(QMainWindow):
         layout.addWidget(self.export_txt_check, 0, 2); layout.addWidget(self.export_json_check, 0, 3)
         self.separate_folders_check = QCheckBox("Use Separate Folders for Each Format")
         layout.addWidget(self.separate_folders_check, 1, 0, 1, 4)
+        layout.addWidget(QLabel("Parallel Jobs:"), 2, 0)
+        self.jobs_spin = QSpinBox(); self.jobs_spin.setRange(1, os.cpu_count() or 1); self.jobs_spin.setValue(1)
+        self.jobs_spin.setToolTip("Number of files to convert at once (directory mode)")
+        layout.addWidget(self.jobs_spin, 2, 1)
         main_layout.addWidget(format_group)
         
-        # Convert Button & Status
+        # Convert/Cancel Buttons & Status
+        buttons = QHBoxLayout()
         self.convert_btn = QPushButton("Convert")
-        main_layout.addWidget(self.convert_btn)
+        self.cancel_btn = QPushButton("Cancel"); self.cancel_btn.setEnabled(False)
+        buttons.addWidget(self.convert_btn); buttons.addWidget(self.cancel_btn)
+        main_layout.addLayout(buttons)
         self.status_label = QLabel("")
         main_layout.addWidget(self.status_label)
         self.progress_bar = QProgressBar(); self.progress_bar.setRange(0, 100)
@@ -78,13 +150,26 @@ class PySideConverterApp(QMainWindow):
         self.browse_output_btn.clicked.connect(self.browse_output_dir)
         self.naming_strategy_combo.currentIndexChanged.connect(self.toggle_custom_name)
         self.convert_btn.clicked.connect(self.convert)
+        self.cancel_btn.clicked.connect(self.cancel)
         # -----------------------------------------------------------------
 
+        # The running conversion, if any
+        self.worker = None
+        self.conversion_thread = None
+        # Forwards the worker's latest progress while a conversion runs
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(1000 // UI_REFRESH_HZ)
+        self.progress_timer.timeout.connect(self.flush_progress)
+
     # --- GUI helper methods (no change) ---
     def browse_input(self):
         input_format = self.input_format_combo.currentText()
         if self.mode_radio_single.isChecked():
-            file_path, _ = QFileDialog.getOpenFileName(self, "Select Input File", "", f"{input_format.upper()} files (*.{input_format})")
+            if input_format == "auto":
+                file_filter = "Subtitle files (*.json *.vtt *.srt);;All files (*)"
+            else:
+                file_filter = f"{input_format.upper()} files (*.{input_format})"
+            file_path, _ = QFileDialog.getOpenFileName(self, "Select Input File", "", file_filter)
             if file_path: self.input_path_entry.setText(file_path)
         else:
             dir_path = QFileDialog.getExistingDirectory(self, "Select Input Directory")
@@ -101,9 +186,6 @@ class PySideConverterApp(QMainWindow):
 
     # --- THIS IS THE KEY REFACTORED METHOD ---
     def convert(self):
-        self.status_label.setText("Starting...")
-        self.progress_bar.setValue(0)
-        
         # 1. Build the config dictionary from the UI
         config = {
             "input_path": self.input_path_entry.text(),
@@ -121,6 +203,8 @@ class PySideConverterApp(QMainWindow):
             "naming_strategy": self.naming_strategy_combo.currentText(),
             "custom_name": self.custom_name_entry.text(),
             "suffix_text": self.suffix_entry.text(),
+
+            "workers": self.jobs_spin.value() if self.mode_radio_dir.isChecked() else 1,
         }
 
         # 2. Validate input
@@ -134,20 +218,75 @@ class PySideConverterApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select at least one output format!")
             return
 
-        # 3. Define the progress callback for the GUI
-        def gui_progress_callback(current, total, message):
-            self.status_label.setText(message)
-            if total > 0:
-                self.progress_bar.setValue(int((current / total) * 100))
-            QApplication.processEvents() # Update UI
+        # 3. Run the conversion on a worker thread, so the window stays responsive
+        self.status_label.setText("Starting...")
+        self.progress_bar.setValue(0)
+        self.worker = ConversionWorker(config)
+        self.conversion_thread = QThread(self)
+        self.worker.moveToThread(self.conversion_thread)
+        self.conversion_thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.finished.connect(self.conversion_thread.quit)
+        self.worker.failed.connect(self.conversion_thread.quit)
+        self.conversion_thread.finished.connect(self.on_thread_finished)
+        self.set_running(True)
+        self.progress_timer.start()
+        self.conversion_thread.start()
+
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText("Cancelling after the current file(s)...")
 
-        # 4. Run the conversion!
-        try:
-            processor.run_conversion(config, gui_progress_callback)
+    def set_running(self, running):
+        """Lock the Convert button (and options) while a batch runs"""
+        self.convert_btn.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        self.jobs_spin.setEnabled(not running)
+
+    # --- Worker signal handlers (run on the GUI thread) ---
+    def flush_progress(self):
+        if self.worker is not None:
+            self.worker.flush_progress()
+
+    def on_progress(self, current, total, message):
+        self.status_label.setText(message)
+        if total > 0:
+            self.progress_bar.setValue(int((current / total) * 100))
+
+    def on_finished(self, message, errors):
+        cancelled = self.worker.cancel_event.is_set()
+        if errors:
+            details = "\n".join(f"{filename}: {error}" for filename, error in errors[:10])
+            if len(errors) > 10:
+                details += f"\n... and {len(errors) - 10} more"
+            QMessageBox.warning(self, "Finished with errors", f"{message}\n\n{len(errors)} file(s) failed:\n{details}")
+        elif cancelled:
+            QMessageBox.information(self, "Cancelled", message)
+        else:
             QMessageBox.information(self, "Success", "Conversion completed successfully!")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
-            self.status_label.setText(f"Error: {str(e)}")
+
+    def on_failed(self, error):
+        QMessageBox.critical(self, "Error", error)
+        self.status_label.setText(f"Error: {error}")
+
+    def on_thread_finished(self):
+        self.progress_timer.stop()
+        self.worker.deleteLater()
+        self.conversion_thread.deleteLater()
+        self.worker = None
+        self.conversion_thread = None
+        self.set_running(False)
+
+    def closeEvent(self, event):
+        # Let the files in flight finish so no output is left half-written
+        if self.conversion_thread is not None:
+            self.worker.cancel()
+            self.conversion_thread.wait()
+        super().closeEvent(event)
 
 # --- Main execution (no change) ---
 if __name__ == "__main__":
@@ -0,0 +1,409 @@
+import os
+import queue
+import threading
+import tkinter as tk
+from tkinter import filedialog, ttk, messagebox, IntVar, StringVar
+from . import processor  # Import our decoupled backend
+
+# How often (per second) the window picks up progress from the worker thread
+UI_REFRESH_HZ = 20
+
+
+class ConversionThread(threading.Thread):
+    """
+    Runs processor.run_conversion in the background. Progress, per-file
+    errors and the outcome are posted to a queue that the Tk main loop
+    drains on a timer; Tk widgets are never touched from this thread.
+    """
+
+    def __init__(self, config):
+        super().__init__(daemon=True)
+        self.config = config
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stop after the files in flight"""
+        self.cancel_event.set()
+
+    def _on_progress(self, current, total, message):
+        self.events.put(("progress", (current, total, message)))
+
+    def _on_metrics(self, file_metrics):
+        if file_metrics["error"] is not None:
+            self.events.put(("error", (os.path.basename(file_metrics["file"]), file_metrics["error"])))
+
+    def run(self):
+        try:
+            processor.run_conversion(
+                self.config, self._on_progress, self._on_metrics, self.cancel_event
+            )
+        except Exception as e:
+            self.events.put(("failed", str(e)))
+        else:
+            self.events.put(("finished", None))
+
+
+class SubtitleConverterApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Subtitle Converter")
+        self.root.geometry("600x660")
+
+        # Create main frame with padding
+        main_frame = ttk.Frame(root, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Input Section
+        input_frame = ttk.LabelFrame(main_frame, text="Input")
+        input_frame.pack(fill=tk.X, pady=5)
+
+        # Mode selection (single file vs directory)
+        self.mode = IntVar(value=0)  # 0: single file, 1: directory
+        ttk.Radiobutton(
+            input_frame,
+            text="Single File",
+            variable=self.mode,
+            value=0,
+            command=self.toggle_input_mode,
+        ).grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        ttk.Radiobutton(
+            input_frame,
+            text="Directory (Batch)",
+            variable=self.mode,
+            value=1,
+            command=self.toggle_input_mode,
+        ).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+
+        # Input File/Directory Selection
+        ttk.Label(input_frame, text="Input Path:").grid(
+            row=1, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.input_path = StringVar()
+        self.input_entry = ttk.Entry(
+            input_frame, textvariable=self.input_path, width=40
+        )
+        self.input_entry.grid(row=1, column=1, padx=5, pady=5, sticky="we")
+        self.browse_input_btn = ttk.Button(
+            input_frame, text="Browse", command=self.browse_input
+        )
+        self.browse_input_btn.grid(row=1, column=2, padx=5, pady=5)
+
+        # Input Format Selection
+        ttk.Label(input_frame, text="Input Format:").grid(
+            row=2, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.input_format = StringVar(value="json")
+        input_format_combobox = ttk.Combobox(
+            input_frame,
+            textvariable=self.input_format,
+            values=["json", "vtt", "srt", "auto"],
+            width=15,
+            state="readonly",
+        )
+        input_format_combobox.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+        input_format_combobox.bind(
+            "<<ComboboxSelected>>", self.update_file_browser_filter
+        )
+
+        # Output Section
+        output_frame = ttk.LabelFrame(main_frame, text="Output")
+        output_frame.pack(fill=tk.X, pady=5)
+
+        ttk.Label(output_frame, text="Output Directory:").grid(
+            row=0, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.output_dir = StringVar()
+        ttk.Entry(output_frame, textvariable=self.output_dir, width=40).grid(
+            row=0, column=1, padx=5, pady=5, sticky="we"
+        )
+        ttk.Button(output_frame, text="Browse", command=self.browse_output_dir).grid(
+            row=0, column=2, padx=5, pady=5
+        )
+
+        # Naming options
+        ttk.Label(output_frame, text="Naming Strategy:").grid(
+            row=1, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.naming_strategy = StringVar(value="source")
+        naming_combobox = ttk.Combobox(
+            output_frame,
+            textvariable=self.naming_strategy,
+            values=["source", "custom", "source_with_suffix"],
+            width=15,
+            state="readonly",
+        )
+        naming_combobox.grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        naming_combobox.bind("<<ComboboxSelected>>", self.toggle_custom_name)
+
+        # Custom base name
+        ttk.Label(output_frame, text="Custom Base Name:").grid(
+            row=2, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.output_name = StringVar(value="output")
+        self.custom_name_entry = ttk.Entry(
+            output_frame, textvariable=self.output_name, width=40
+        )
+        self.custom_name_entry.grid(row=2, column=1, padx=5, pady=5, sticky="we")
+        self.custom_name_entry.configure(
+            state="disabled"
+        )  # Initially disabled as source is selected
+
+        # Custom suffix (for source_with_suffix option)
+        ttk.Label(output_frame, text="Custom Suffix:").grid(
+            row=3, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.suffix = StringVar(value="_subtitle")
+        self.suffix_entry = ttk.Entry(output_frame, textvariable=self.suffix, width=40)
+        self.suffix_entry.grid(row=3, column=1, padx=5, pady=5, sticky="we")
+        self.suffix_entry.configure(state="disabled")  # Initially disabled
+
+        # Format options
+        format_frame = ttk.LabelFrame(main_frame, text="Output Formats")
+        format_frame.pack(fill=tk.X, pady=5)
+
+        self.export_srt = IntVar(value=1)
+        ttk.Checkbutton(format_frame, text="SRT", variable=self.export_srt).grid(
+            row=0, column=0, padx=5, pady=5, sticky="w"
+        )
+
+        self.export_vtt = IntVar(value=0)
+        ttk.Checkbutton(format_frame, text="VTT", variable=self.export_vtt).grid(
+            row=0, column=1, padx=5, pady=5, sticky="w"
+        )
+
+        self.export_txt = IntVar(value=1)
+        ttk.Checkbutton(format_frame, text="Plain Text", variable=self.export_txt).grid(
+            row=0, column=2, padx=5, pady=5, sticky="w"
+        )
+
+        self.export_json = IntVar(value=0)
+        ttk.Checkbutton(format_frame, text="JSON", variable=self.export_json).grid(
+            row=0, column=3, padx=5, pady=5, sticky="w"
+        )
+
+        self.separate_folders = IntVar(value=0)
+        ttk.Checkbutton(
+            format_frame,
+            text="Use Separate Folders for Each Format",
+            variable=self.separate_folders,
+        ).grid(row=1, column=0, columnspan=4, padx=5, pady=5, sticky="w")
+
+        # Parallel jobs (directory mode)
+        ttk.Label(format_frame, text="Parallel Jobs:").grid(
+            row=2, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.jobs = IntVar(value=1)
+        self.jobs_spinbox = ttk.Spinbox(
+            format_frame,
+            from_=1,
+            to=os.cpu_count() or 1,
+            textvariable=self.jobs,
+            width=5,
+            state="readonly",
+        )
+        self.jobs_spinbox.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+        # Convert/Cancel Buttons
+        convert_frame = ttk.Frame(main_frame)
+        convert_frame.pack(fill=tk.X, pady=10)
+        self.convert_btn = ttk.Button(
+            convert_frame, text="Convert", command=self.convert
+        )
+        self.convert_btn.pack(side=tk.LEFT, expand=True, pady=5)
+        self.cancel_btn = ttk.Button(
+            convert_frame, text="Cancel", command=self.cancel, state="disabled"
+        )
+        self.cancel_btn.pack(side=tk.LEFT, expand=True, pady=5)
+
+        # Status
+        self.status_var = StringVar()
+        self.status = ttk.Label(
+            main_frame, textvariable=self.status_var, foreground="blue", wraplength=580
+        )
+        self.status.pack(fill=tk.X, pady=5)
+
+        # Progress bar
+        self.progress = ttk.Progressbar(
+            main_frame, orient="horizontal", length=580, mode="determinate"
+        )
+        self.progress.pack(fill=tk.X, pady=5)
+        self.progress["maximum"] = 100
+        self.progress["value"] = 0
+
+        # The running conversion, if any, and the per-file errors it reported
+        self.worker = None
+        self.errors = []
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def update_file_browser_filter(self, event=None):
+        """Update the file browser filter based on selected input format"""
+        # Reset the input path when format changes
+        self.input_path.set("")
+
+    def toggle_input_mode(self):
+        self.browse_input()  # Reset the input path
+
+    def toggle_custom_name(self, event=None):
+        strategy = self.naming_strategy.get()
+        if strategy == "custom":
+            self.custom_name_entry.configure(state="normal")
+            self.suffix_entry.configure(state="disabled")
+        elif strategy == "source_with_suffix":
+            self.custom_name_entry.configure(state="disabled")
+            self.suffix_entry.configure(state="normal")
+        else:  # source
+            self.custom_name_entry.configure(state="disabled")
+            self.suffix_entry.configure(state="disabled")
+
+    def browse_input(self):
+        input_format = self.input_format.get()
+        if input_format == "auto":
+            filetypes = [("Subtitle files", "*.json *.vtt *.srt"), ("All files", "*")]
+        else:
+            filetypes = [(f"{input_format.upper()} files", f"*.{input_format}")]
+
+        if self.mode.get() == 0:  # Single file
+            file_path = filedialog.askopenfilename(filetypes=filetypes)
+            if file_path:
+                self.input_path.set(file_path)
+        else:  # Directory
+            dir_path = filedialog.askdirectory()
+            if dir_path:
+                self.input_path.set(dir_path)
+
+    def browse_output_dir(self):
+        dir_path = filedialog.askdirectory()
+        if dir_path:
+            self.output_dir.set(dir_path)
+
+    def convert(self):
+        # 1. Build the config dictionary from the UI
+        is_directory = self.mode.get() == 1
+        config = {
+            "input_path": self.input_path.get(),
+            "output_dir": self.output_dir.get(),
+            "input_format": self.input_format.get(),
+            "is_directory": is_directory,
+            "export_srt": bool(self.export_srt.get()),
+            "export_vtt": bool(self.export_vtt.get()),
+            "export_txt": bool(self.export_txt.get()),
+            "export_json": bool(self.export_json.get()),
+            "separate_folders": bool(self.separate_folders.get()),
+            "naming_strategy": self.naming_strategy.get(),
+            "custom_name": self.output_name.get(),
+            "suffix_text": self.suffix.get(),
+            "workers": self.jobs.get() if is_directory else 1,
+        }
+
+        # 2. Validate input
+        if not config["input_path"]:
+            messagebox.showwarning(
+                "Warning", "Please select an input file or directory!"
+            )
+            return
+        if not config["output_dir"]:
+            messagebox.showwarning("Warning", "Please select an output directory!")
+            return
+        if not any(
+            [
+                config["export_srt"],
+                config["export_txt"],
+                config["export_vtt"],
+                config["export_json"],
+            ]
+        ):
+            messagebox.showwarning(
+                "Warning", "Please select at least one output format!"
+            )
+            return
+
+        # 3. Run the conversion in the background and poll it for progress
+        self.status_var.set("Starting...")
+        self.progress["value"] = 0
+        self.errors = []
+        self.worker = ConversionThread(config)
+        self.set_running(True)
+        self.worker.start()
+        self.root.after(1000 // UI_REFRESH_HZ, self.poll_worker)
+
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.configure(state="disabled")
+            self.status_var.set("Cancelling after the current file(s)...")
+
+    def set_running(self, running):
+        """Lock the Convert button (and options) while a batch runs"""
+        self.convert_btn.configure(state="disabled" if running else "normal")
+        self.cancel_btn.configure(state="normal" if running else "disabled")
+        self.jobs_spinbox.configure(state="disabled" if running else "readonly")
+
+    def poll_worker(self):
+        """
+        Apply everything the worker posted since the last poll. Only the
+        latest progress update is drawn, so the window repaints at most
+        UI_REFRESH_HZ times per second however fast files complete.
+        """
+        latest = None
+        outcome = None
+        while True:
+            try:
+                kind, value = self.worker.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest = value
+            elif kind == "error":
+                self.errors.append(value)
+            else:
+                outcome = (kind, value)
+
+        if latest is not None:
+            current, total, message = latest
+            self.status_var.set(message)
+            if total > 0:
+                self.progress["value"] = (current / total) * 100
+
+        if outcome is None:
+            self.root.after(1000 // UI_REFRESH_HZ, self.poll_worker)
+            return
+
+        cancelled = self.worker.cancel_event.is_set()
+        self.worker = None
+        self.set_running(False)
+        kind, value = outcome
+        if kind == "failed":
+            messagebox.showerror("Error", value)
+            self.status_var.set(f"Error: {value}")
+        elif self.errors:
+            details = "\n".join(
+                f"{filename}: {error}" for filename, error in self.errors[:10]
+            )
+            if len(self.errors) > 10:
+                details += f"\n... and {len(self.errors) - 10} more"
+            messagebox.showwarning(
+                "Finished with errors",
+                f"{self.status_var.get()}\n\n{len(self.errors)} file(s) failed:\n{details}",
+            )
+        elif cancelled:
+            messagebox.showinfo("Cancelled", self.status_var.get())
+        else:
+            messagebox.showinfo("Success", "Conversion completed successfully!")
+
+    def on_close(self):
+        # Let the files in flight finish so no output is left half-written
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.join()
+        self.root.destroy()
+
+
+def main():
+    root = tk.Tk()
+    SubtitleConverterApp(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
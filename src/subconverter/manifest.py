@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from .transforms import TRANSFORM_DEFAULTS
+
+MANIFEST_NAME = ".subconvert-manifest.json"
+MANIFEST_VERSION = 1
+
+# Config keys that change what gets written (and therefore invalidate outputs)
+FINGERPRINT_KEYS = (
+    "input_format",
+    "export_srt",
+    "export_vtt",
+    "export_txt",
+    "export_json",
+    "naming_strategy",
+    "custom_name",
+    "suffix_text",
+    "separate_folders",
+)
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def config_fingerprint(config):
+    """The subset of the config that affects the generated outputs"""
+    fingerprint = {key: config.get(key) for key in FINGERPRINT_KEYS}
+    # The JSON style only matters when JSON is exported, and is only listed
+    # when it isn't the default, so older manifests (and GUI configs without
+    # the key) still match
+    if config.get("export_json") and (config.get("json_style") or "pretty") != "pretty":
+        fingerprint["json_style"] = config["json_style"]
+    # Transform options are only listed once set, so manifests written
+    # before they existed still match plain conversions
+    fingerprint.update(
+        (key, config[key]) for key, default in TRANSFORM_DEFAULTS.items()
+        if config.get(key, default) != default
+    )
+    return fingerprint
+
+class Manifest:
+    """
+    Records, per input file, its size/mtime/content hash, the outputs it
+    produced and the config they were produced with, so an incremental run
+    can skip files whose outputs are current. Output paths are stored
+    relative to the output directory.
+    """
+
+    def __init__(self, output_dir, fingerprint, entries=None):
+        self.output_dir = output_dir
+        self.fingerprint = fingerprint
+        self.entries = entries or {}
+        # How many entries list each output path, for cheap stale checks
+        self._claims = Counter()
+        for entry in self.entries.values():
+            self._claims.update(entry["outputs"])
+
+    @classmethod
+    def load(cls, output_dir, config):
+        """Load the manifest from output_dir, or start an empty one"""
+        fingerprint = config_fingerprint(config)
+        path = os.path.join(output_dir, MANIFEST_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(output_dir, fingerprint)
+        except ValueError:
+            print(f"Ignoring unreadable manifest: {path}")
+            return cls(output_dir, fingerprint)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(output_dir, fingerprint)
+        return cls(output_dir, fingerprint, data.get("files", {}))
+
+    def save(self):
+        """Atomically write the manifest back to the output directory"""
+        path = os.path.join(self.output_dir, MANIFEST_NAME)
+        tmp_path = f"{path}.tmp"
+        data = {"version": MANIFEST_VERSION, "files": self.entries}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def key(input_file):
+        return os.path.abspath(input_file)
+
+    def is_current(self, input_file, outputs):
+        """True if input_file is unchanged and its expected outputs all exist"""
+        entry = self.entries.get(self.key(input_file))
+        if entry is None or entry["config"] != self.fingerprint:
+            return False
+        if sorted(entry["outputs"]) != sorted(outputs):
+            return False
+        if not all(os.path.exists(os.path.join(self.output_dir, out)) for out in outputs):
+            return False
+
+        stat = os.stat(input_file)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        # Touched but possibly unchanged: fall back to the content hash
+        if hash_file(input_file) != entry["sha256"]:
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def record(self, input_file, outputs):
+        """
+        Remember a successful conversion. Returns the previous outputs of
+        this file that are no longer produced (and not used by any other
+        entry), which the caller should delete.
+        """
+        previous = self._pop(self.key(input_file))
+        stat = os.stat(input_file)
+        self._claims.update(outputs)
+        self.entries[self.key(input_file)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": hash_file(input_file),
+            "outputs": sorted(outputs),
+            "config": self.fingerprint,
+        }
+        return self._unclaimed(previous)
+
+    def forget(self, input_file):
+        """Drop a file's entry (e.g. after a failed conversion)"""
+        self._pop(self.key(input_file))
+
+    def remove_missing_inputs(self):
+        """
+        Drop entries whose input file no longer exists and return their
+        outputs that no remaining entry claims.
+        """
+        orphaned = []
+        for key in list(self.entries):
+            if not os.path.exists(key):
+                orphaned.extend(self._pop(key))
+        return self._unclaimed(orphaned)
+
+    def _pop(self, key):
+        """Remove an entry and return the outputs it listed"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return []
+        self._claims.subtract(entry["outputs"])
+        return entry["outputs"]
+
+    def _unclaimed(self, outputs):
+        return sorted(out for out in set(outputs) if self._claims[out] <= 0)
@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+
+STAGES = ("read_s", "parse_s", "generate_s", "write_s")
+
+# Upper bounds (seconds) of the latency histogram buckets; a last, unbounded
+# bucket catches everything slower
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _nearest_rank(fraction, count):
+    """1-based rank of the nearest-rank percentile: ceil(fraction * count), at least 1"""
+    # The tolerance keeps float noise (0.07 * 100 == 7.000000000000001)
+    # from pushing an exact rank up by one
+    return max(1, math.ceil(fraction * count - 1e-9))
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = _nearest_rank(fraction, len(sorted_values))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def stage_total(file_metrics, stage):
+    """Seconds spent in a stage; per-format stages (dicts) are summed"""
+    value = file_metrics.get(stage, 0.0)
+    if isinstance(value, dict):
+        return sum(value.values())
+    return value
+
+class MetricsCollector:
+    """
+    Collects the per-file metrics that run_conversion reports and summarises
+    them at the end of a batch. Instances are callable, so they can be
+    passed directly as the metrics_callback.
+
+    Each file's metrics is a dict with "file", "error", "bytes_read",
+    "cues", "total_s", "read_s" and "parse_s", plus "generate_s" and
+    "write_s" dicts keyed by output extension ("write_s" also has a
+    "commit" entry for publishing the files).
+    """
+
+    def __init__(self):
+        self.files = []
+        self.started = time.perf_counter()
+
+    def __call__(self, file_metrics):
+        self.add(file_metrics)
+
+    def add(self, file_metrics):
+        self.files.append(file_metrics)
+
+    def summary(self, elapsed=None, slowest=5):
+        """Aggregate throughput, latency percentiles, stage totals and the slowest files"""
+        if elapsed is None:
+            elapsed = time.perf_counter() - self.started
+        latencies = sorted(m["total_s"] for m in self.files)
+        total_bytes = sum(m.get("bytes_read", 0) for m in self.files)
+        return {
+            "files": len(self.files),
+            "failed": sum(1 for m in self.files if m.get("error")),
+            "cues": sum(m.get("cues", 0) for m in self.files),
+            "bytes_read": total_bytes,
+            "elapsed_s": elapsed,
+            "files_per_s": len(self.files) / elapsed if elapsed else 0.0,
+            "mb_per_s": total_bytes / 1e6 / elapsed if elapsed else 0.0,
+            "p50_s": _percentile(latencies, 0.50),
+            "p99_s": _percentile(latencies, 0.99),
+            "stages_s": {stage: sum(stage_total(m, stage) for m in self.files) for stage in STAGES},
+            "slowest": [
+                (m["file"], m["total_s"])
+                for m in sorted(self.files, key=lambda m: m["total_s"], reverse=True)[:slowest]
+            ],
+        }
+
+    def format_summary(self, elapsed=None):
+        """Human-readable version of summary()"""
+        s = self.summary(elapsed)
+        lines = [
+            f"Files: {s['files']} ({s['failed']} failed), cues: {s['cues']}, "
+            f"read: {s['bytes_read'] / 1e6:.1f} MB in {s['elapsed_s']:.2f}s",
+            f"Throughput: {s['files_per_s']:.1f} files/s, {s['mb_per_s']:.2f} MB/s",
+            f"Per-file latency: p50 {s['p50_s'] * 1000:.1f} ms, p99 {s['p99_s'] * 1000:.1f} ms",
+            "Stage totals: " + ", ".join(
+                f"{stage[:-2]} {seconds:.2f}s" for stage, seconds in s["stages_s"].items()
+            ),
+        ]
+        if s["slowest"]:
+            lines.append("Slowest files:")
+            lines.extend(f"  {seconds * 1000:8.1f} ms  {path}" for path, seconds in s["slowest"])
+        return "\n".join(lines)
+
+class Histogram:
+    """
+    Fixed-bucket histogram for long-running processes such as the server:
+    memory stays constant however many values are observed, so percentiles
+    are estimates (the upper bound of the bucket they fall in).
+    Thread-safe.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)  # First bucket with value <= bound
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        """(per-bucket counts, total count, sum), read consistently"""
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def percentile(self, fraction):
+        """Estimated percentile: the upper bound of the bucket holding that rank"""
+        counts, count, _ = self.snapshot()
+        if not count:
+            return 0.0
+        rank = _nearest_rank(fraction, count)
+        seen = 0
+        for bound, bucket_count in zip(self.bounds + (float("inf"),), counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
@@ -1,6 +1,19 @@
 import os
-import json
-from . import formats # Import from our own package
+import io
+import asyncio
+import mmap
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fnmatch import fnmatch
+from functools import partial
+from . import archives, decoders, formats, transforms # Import from our own package
+from .manifest import Manifest
+from .writer import OutputBatch, output_batch
 
 def get_output_filename(input_file, strategy, custom_name, suffix_text):
     """Determine the output filename based on the naming strategy"""
@@ -14,103 +27,1160 @@ def get_output_filename(input_file, strategy, custom_name, suffix_text):
     else:  # custom
         return custom_name
 
-def save_output_files(subtitles, output_dir, output_base, config):
-    """Save the subtitle files in the selected formats"""
-    
-    def get_path(ext):
-        if config["separate_folders"]:
-            folder = os.path.join(output_dir, ext)
-            os.makedirs(folder, exist_ok=True)
-            return os.path.join(folder, f"{output_base}.{ext}")
-        else:
-            return os.path.join(output_dir, f"{output_base}.{ext}")
+def get_output_base(input_file, config):
+    """
+    Output name (without extension) for a file, relative to the output
+    directory. In recursive mode it keeps the input's sub-folder so the
+    output tree mirrors the input tree.
+    """
+    output_base = get_output_filename(
+        input_file,
+        config["naming_strategy"],
+        config["custom_name"],
+        config["suffix_text"],
+    )
+    if config.get("recursive") and config["is_directory"]:
+        rel_dir = os.path.relpath(os.path.dirname(input_file), config["input_path"])
+        if rel_dir != os.curdir:
+            output_base = os.path.join(rel_dir, output_base)
+    return output_base
 
-    if config["export_srt"]:
-        srt_content = formats.generate_srt(subtitles)
-        with open(get_path("srt"), "w", encoding="utf-8") as f:
-            f.write(srt_content)
+def get_output_path(output_dir, output_base, ext, config):
+    """Build the output path for one format (OutputBatch creates its folder when writing)"""
+    if config["separate_folders"]:
+        return os.path.join(output_dir, ext, f"{output_base}.{ext}")
+    return os.path.join(output_dir, f"{output_base}.{ext}")
 
-    if config["export_vtt"]:
-        vtt_content = formats.generate_vtt(subtitles)
-        with open(get_path("vtt"), "w", encoding="utf-8") as f:
-            f.write(vtt_content)
+def get_output_name(output_base, ext, config):
+    """Output path for one format, relative to the output directory"""
+    filename = f"{output_base}.{ext}"
+    return os.path.join(ext, filename) if config["separate_folders"] else filename
 
-    if config["export_txt"]:
-        txt_content = formats.generate_plain_text(subtitles)
-        with open(get_path("txt"), "w", encoding="utf-8") as f:
-            f.write(txt_content)
+def get_relative_outputs(input_file, config):
+    """List the output paths (relative to the output directory) a file will produce"""
+    output_base = get_output_base(input_file, config)
+    return [get_output_name(output_base, ext, config) for ext in selected_formats(config)]
 
-    if config["export_json"]:
-        json_data = formats.generate_json(subtitles)
-        with open(get_path("json"), "w", encoding="utf-8") as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+def selected_formats(config):
+    """Extensions of the output formats enabled in the config"""
+    return [ext for ext in formats.WRITERS if config[f"export_{ext}"]]
 
-def run_conversion(config, progress_callback=None):
+def json_style(config):
+    """Layout of JSON outputs, "pretty" (the default) or "compact" (see formats.JsonWriter)"""
+    return config.get("json_style") or "pretty"
+
+def save_output_files(subtitles, output_dir, output_base, config, metrics=None, batch=None):
     """
-    Runs the full conversion process based on a config dictionary.
-    
-    The progress_callback (if provided) will be called with:
-    (current_file_index, total_files, message)
+    Save the subtitle files in the selected formats. All formats are
+    rendered in a single pass so each cue's timestamps and text are only
+    formatted once. The files are written and published together through an
+    OutputBatch (or handed to batch, see _file_batch). If a metrics dict is
+    given, the shared generation time and the per-format write times (plus
+    "commit") are recorded in it.
+    """
+    exts = selected_formats(config)
+    began = time.perf_counter()
+    rendered = formats.render_formats(subtitles, exts, json_style(config))
+    if metrics is not None:
+        metrics["generate_s"]["+".join(exts)] = time.perf_counter() - began
+
+    write_times = _write_outputs(rendered, output_base, dict(config, output_dir=output_dir), batch)
+    if metrics is not None:
+        metrics["write_s"].update(write_times)
+
+def json_decoder(config):
+    """
+    The JSON decoder backend for a conversion. "auto" (the default) picks
+    the fastest installed one, except in streaming mode, where the
+    incremental stdlib decoder keeps memory flat, and with a clip end
+    (config["clip_end_ms"]), where it stops decoding past the window
+    instead of parsing the whole document.
+    """
+    decoder = config.get("json_decoder") or "auto"
+    if decoder == "auto" and (config.get("streaming") or config.get("clip_end_ms") is not None):
+        return "stdlib"
+    return decoder
+
+# Input formats that "auto" chooses between, and how much of a file it reads to decide
+INPUT_FORMATS = ("json", "vtt", "srt")
+SNIFF_SIZE = 512
+
+def format_label(input_format):
+    """How an input format is named in messages ("auto" covers all of them)"""
+    return "subtitle" if input_format == "auto" else input_format.upper()
+
+def detect_input_format(head, input_format):
+    """
+    Resolve the input format of a file from its first SNIFF_SIZE characters
+    (head). Formats other than "auto" are returned as-is.
+    """
+    if input_format != "auto":
+        return input_format
+    detected = formats.sniff_format(head)
+    if detected is None:
+        raise ValueError("Unrecognised subtitle format (expected JSON, VTT or SRT)")
+    return detected
+
+def buffer_head(buffer):
+    """The start of a UTF-8 buffer as text, for detect_input_format"""
+    return bytes(buffer[:SNIFF_SIZE]).decode("utf-8", "replace")
+
+def iter_cues(f, input_format):
+    """Yield subtitle dictionaries from an open text file in the given input format"""
+    if input_format == "json":
+        # Decode the events one at a time instead of loading the whole tree
+        return formats.iter_json_cues(formats.iter_json_events(f))
+    elif input_format == "srt":
+        return formats.iter_srt_cues(f)
+    else: # vtt
+        return formats.iter_vtt_cues(f)
+
+def iter_buffer_cues(buffer, input_format, decoder="auto", start_ms=None):
+    """
+    Yield subtitle dictionaries from a UTF-8 bytes-like buffer (bytes or an
+    mmap) in the given input format. VTT and SRT are scanned as bytes; JSON
+    goes through the chosen decoder backend (see decoders.JSON_DECODERS).
+    With start_ms, VTT and SRT scanning skips the text of the cues that
+    ended before that time instead of starting at the top of the file.
+    """
+    if input_format == "json":
+        return formats.iter_json_cues(decoders.iter_json_buffer_events(buffer, decoder))
+    elif input_format == "srt":
+        return formats.iter_srt_cues_bytes(buffer, start_ms=start_ms)
+    else: # vtt
+        return formats.iter_vtt_cues_bytes(buffer, start_ms=start_ms)
+
+@contextmanager
+def map_input(f):
+    """
+    Memory-map an open binary file read-only, so parsers can scan it
+    without copying it into memory. Empty files map to b"", and files that
+    can't be mapped (pipes, some special files) are read instead.
+    """
+    try:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        # ValueError: empty file
+        yield f.read()
+        return
+    try:
+        yield buffer
+    finally:
+        try:
+            buffer.close()
+        except BufferError:
+            pass  # A parser that stopped early still holds a view; unmapped when collected
+
+def new_file_metrics(input_file):
+    """
+    Empty per-file metrics record (see metrics.MetricsCollector). Inputs
+    are memory-mapped, so read_s covers opening and mapping the file and
+    the actual page-ins are counted in parse_s.
+    """
+    return {
+        "file": input_file,
+        "error": None,
+        "bytes_read": 0,
+        "cues": 0,
+        "total_s": 0.0,
+        "read_s": 0.0,
+        "parse_s": 0.0,
+        "generate_s": {},
+        "write_s": {},
+    }
+
+def stream_file(input_file, config, metrics=None, batch=None):
+    """
+    Convert one file without materialising the cue list: the parser yields
+    cues and every selected format is written from that single pass.
+
+    Generation and writing are interleaved with parsing here, so metrics
+    only separate read_s from parse_s (which includes the writing).
+    """
+    output_base = get_output_base(input_file, config)
+    if metrics is None:
+        metrics = new_file_metrics(input_file)
+
+    began = time.perf_counter()
+    with open(input_file, "rb") as f, map_input(f) as buffer, _file_batch(config, batch) as file_batch, ExitStack() as outputs:
+        metrics["bytes_read"] = len(buffer)
+        metrics["read_s"] = time.perf_counter() - began
+        input_format = detect_input_format(buffer_head(buffer), config["input_format"])
+        writers = []
+        for ext in selected_formats(config):
+            path = get_output_path(config["output_dir"], output_base, ext, config)
+            out = outputs.enter_context(file_batch.open(path))
+            writers.append(formats.make_writer(ext, out, json_style(config)))
+
+        cues = transforms.apply_transforms(iter_buffer_cues(buffer, input_format, json_decoder(config), config.get("clip_start_ms")), config)
+        metrics["cues"] = formats.write_cues(cues, writers)
+    metrics["parse_s"] = time.perf_counter() - began - metrics["read_s"]
+    return metrics
+
+def convert_file(input_file, config, metrics=None, batch=None):
+    """
+    Parse one input file and save it in every selected output format.
+    Returns the file's metrics (bytes read, cue count, per-stage times).
+    The outputs are published at once, or with batch (a run's
+    OutputBatch) handed to it to publish later.
+    """
+    if metrics is None:
+        metrics = new_file_metrics(input_file)
+    if config.get("streaming"):
+        return stream_file(input_file, config, metrics, batch)
+
+    # --- 1. Parse content ---
+    began = time.perf_counter()
+    with open(input_file, "rb") as f, map_input(f) as buffer:
+        metrics["bytes_read"] = len(buffer)
+        metrics["read_s"] = time.perf_counter() - began
+        input_format = detect_input_format(buffer_head(buffer), config["input_format"])
+        cues = iter_buffer_cues(buffer, input_format, json_decoder(config), config.get("clip_start_ms"))
+        subtitles = formats.CueTable.from_cues(transforms.apply_transforms(cues, config))
+    metrics["parse_s"] = time.perf_counter() - began - metrics["read_s"]
+    metrics["cues"] = len(subtitles)
+
+    # --- 2. Get output name ---
+    output_base = get_output_base(input_file, config)
+
+    # --- 3. Save all formats ---
+    save_output_files(subtitles, config["output_dir"], output_base, config, metrics, batch)
+    return metrics
+
+def render_content(content, config):
+    """
+    Parse already-read input (text, or UTF-8 bytes as returned by
+    _read_input) and render every selected format. This is the CPU-bound
+    part of a conversion, with no file I/O.
+
+    Returns ({extension: rendered text}, metrics) where metrics holds the
+    cue count and the parse/generate times.
+    """
+    metrics = {"cues": 0, "parse_s": 0.0, "generate_s": {}}
+    began = time.perf_counter()
+    if isinstance(content, str):
+        input_format = detect_input_format(content[:SNIFF_SIZE], config["input_format"])
+        cues = iter_cues(io.StringIO(content), input_format)
+    else:
+        input_format = detect_input_format(buffer_head(content), config["input_format"])
+        cues = iter_buffer_cues(content, input_format, json_decoder(config), config.get("clip_start_ms"))
+    subtitles = formats.CueTable.from_cues(transforms.apply_transforms(cues, config))
+    metrics["parse_s"] = time.perf_counter() - began
+    metrics["cues"] = len(subtitles)
+
+    exts = selected_formats(config)
+    began = time.perf_counter()
+    rendered = formats.render_formats(subtitles, exts, json_style(config))
+    metrics["generate_s"]["+".join(exts)] = time.perf_counter() - began
+    return rendered, metrics
+
+# Settings convert_many uses for any the caller's config leaves out
+CONVERT_MANY_DEFAULTS = {
+    "input_format": "auto",
+    "export_srt": False,
+    "export_vtt": False,
+    "export_txt": False,
+    "export_json": False,
+    "naming_strategy": "source",
+    "custom_name": "output",
+    "suffix_text": "_subtitle",
+    "separate_folders": False,
+}
+
+def _read_source(source):
+    """Input data for convert_many: a bytes-like object or str as is, or a file object's contents"""
+    if isinstance(source, (bytes, bytearray, memoryview, str)):
+        return source
+    return source.read()
+
+def _convert_item(name, source, config):
+    """
+    convert_many's work for one input: returns (name, outputs, metrics),
+    with the error message (or None) under metrics["error"] instead of
+    raising. Runs inline or in a worker process.
+    """
+    metrics = new_file_metrics(name)
+    outputs = {}
+    began = time.perf_counter()
+    try:
+        content = _read_source(source)
+        metrics["bytes_read"] = len(content)
+        metrics["read_s"] = time.perf_counter() - began
+        rendered, render_metrics = render_content(content, config)
+        metrics.update(render_metrics)
+
+        output_base = get_output_filename(
+            name, config["naming_strategy"], config["custom_name"], config["suffix_text"]
+        )
+        output_base = os.path.join(os.path.dirname(name), output_base)
+        for ext, text in rendered.items():
+            output_name = get_output_name(output_base, ext, config)
+            outputs[output_name] = text.encode("utf-8")
+    except Exception as e:
+        metrics["error"] = str(e)
+        outputs = {}
+    metrics["total_s"] = time.perf_counter() - began
+    return name, outputs, metrics
+
+def _process_pool(workers, initializer=None):
+    """
+    A process pool whose workers don't fork this process: conversions run
+    next to a prefetch thread (and in the GUIs, from a worker thread), and
+    forking a multi-threaded process can deadlock on a lock another thread
+    held at the time
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(method), initializer=initializer
+    )
+
+def _convert_items_parallel(items, config, workers):
+    """
+    Run _convert_item over a process pool, reading each source in this
+    process first (file objects can't be sent to a worker). As in
+    _dispatch, at most workers * 2 inputs are in flight and results come
+    back in input order.
+    """
+    max_in_flight = workers * 2
+    pending = deque()
+    items = iter(items)
+
+    with _process_pool(workers) as executor:
+        while True:
+            while len(pending) < max_in_flight:
+                item = next(items, None)
+                if item is None:
+                    break
+                name, source = item
+                try:
+                    content = _read_source(source)
+                    if isinstance(content, memoryview):
+                        content = content.tobytes()  # Views can't be pickled
+                    pending.append((name, executor.submit(_convert_item, name, content, config)))
+                except Exception as e:
+                    pending.append((name, e))
+
+            if not pending:
+                break
+
+            name, future = pending.popleft()
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                yield future.result()
+            except Exception as e:
+                # The source couldn't be read, or the worker process died
+                metrics = new_file_metrics(name)
+                metrics["error"] = str(e)
+                yield name, {}, metrics
+
+def convert_many(items, config, sink=None):
+    """
+    Convert subtitles that are already in memory, with no filesystem round
+    trip. items is an iterable of (name, source) pairs, where source is
+    bytes (or any bytes-like object), str, or a file object opened in
+    binary or text mode.
+
+    config takes the same conversion options as run_conversion (input
+    format, export_* flags, naming, separate_folders, json_style...);
+    input_path and output_dir are not used. Unset options fall back to
+    CONVERT_MANY_DEFAULTS, so input_format defaults to "auto". With
+    config["workers"] > 1 the inputs are parsed and rendered on a process
+    pool, still yielding in order.
+
+    Yields (name, outputs, metrics) for each input, in order, as soon as it
+    is converted. outputs maps output names to UTF-8 bytes with "\n" line
+    endings. The names are what run_conversion would write, relative to
+    the output directory; any folders in the input's name are kept, as in
+    recursive mode. If sink is given, it is also called as
+    sink(output_name, data) for every output (e.g. to upload it).
+
+    As in a batch run, a bad input doesn't stop the others: its outputs are
+    empty and metrics["error"] holds the message.
+    """
+    config = {**CONVERT_MANY_DEFAULTS, **config}
+    if not selected_formats(config):
+        raise ValueError("No output format selected")
+
+    workers = config.get("workers") or 1
+    if workers > 1:
+        results = _convert_items_parallel(items, config, workers)
+    else:
+        results = (_convert_item(name, source, config) for name, source in items)
+
+    for name, outputs, metrics in results:
+        if sink is not None and outputs:
+            began = time.perf_counter()
+            try:
+                for output_name, data in outputs.items():
+                    sink(output_name, data)
+            except Exception as e:
+                metrics["error"] = str(e)
+                outputs = {}
+            metrics["write_s"]["sink"] = time.perf_counter() - began
+            metrics["total_s"] += metrics["write_s"]["sink"]
+        yield name, outputs, metrics
+
+def _convert_file_safe(input_file, config, batch=None):
+    """
+    Converts one file (into batch, if given) and returns its metrics, with
+    the error message (or None) under "error" instead of raising, so one
+    bad file can't stop the batch.
+    """
+    metrics = new_file_metrics(input_file)
+    began = time.perf_counter()
+    try:
+        convert_file(input_file, config, metrics, batch)
+    except Exception as e:
+        metrics["error"] = str(e)
+    metrics["total_s"] = time.perf_counter() - began
+    return metrics
+
+# Each pool worker's share of the run's outputs (see _init_output_worker)
+_worker_batch = None
+
+def _init_output_worker():
+    global _worker_batch
+    _worker_batch = OutputBatch()
+
+def _convert_file_in_worker(input_file, config):
+    """
+    Pool entry point: _convert_file_safe into the worker's batch. Returns
+    (metrics, written files) for the parent to publish with the run's
+    batch; the worker's batch lives as long as the pool, so each output
+    folder is created once per worker and run.
+    """
+    metrics = _convert_file_safe(input_file, config, _worker_batch)
+    return metrics, _worker_batch.detach()
+
+def _future_result(future, input_file, batch):
+    try:
+        metrics, written = future.result()
+    except Exception as e:
+        # The worker process itself died (e.g. BrokenProcessPool)
+        metrics = new_file_metrics(input_file)
+        metrics["error"] = str(e)
+        return metrics
+    batch.adopt(written)
+    return metrics
+
+def _discard_result(future):
+    """Delete the files written by a pool conversion whose result won't be used"""
+    if future.cancel():
+        return
+    try:
+        _, written = future.result()
+    except Exception:
+        return
+    for temp_path, _ in written:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def _dispatch(jobs, config, workers, batch):
+    """
+    Yields (index, input_file, get_result) for each (index, input_file) job,
+    in order. Calling get_result() runs or waits for that file's conversion
+    into batch (the run's OutputBatch) and returns its metrics (with the
+    error message, if any, under "error").
+
+    With more than one worker the files are spread across a process pool.
+    At most workers * 2 files are in flight at once, and results are still
+    collected in submission order so the progress callback sees the same
+    sequence as a sequential run.
+    """
+    if workers <= 1:
+        for i, input_file in jobs:
+            yield i, input_file, partial(_convert_file_safe, input_file, config, batch)
+        return
+
+    max_in_flight = workers * 2
+    pending = deque()
+    jobs = iter(jobs)
+
+    with _process_pool(workers, _init_output_worker) as executor:
+        try:
+            while True:
+                # Top up the queue of in-flight files
+                while len(pending) < max_in_flight:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    i, input_file = job
+                    future = executor.submit(_convert_file_in_worker, input_file, config)
+                    pending.append((i, input_file, future))
+
+                if not pending:
+                    break
+
+                i, input_file, future = pending[0]
+                yield i, input_file, partial(_future_result, future, input_file, batch)
+                pending.popleft()
+        finally:
+            # If the run stopped early, the files in flight won't be published
+            for _, _, future in pending:
+                _discard_result(future)
+
+def _matches_any(name, rel_path, patterns):
+    """True if a file/folder name or its relative path matches any glob"""
+    return any(fnmatch(name, p) or fnmatch(rel_path, p) for p in patterns)
+
+def _walk_files(root, recursive, include, exclude):
+    """
+    Lazily yield matching file paths under root using os.scandir. Files are
+    yielded as each folder is read, so callers can start before the walk
+    has finished. Globs are matched against the file name and against the
+    path relative to root (with "/" separators); excluded folders are pruned.
+    """
+    stack = [(root, "")]
+    while stack:
+        folder, rel_folder = stack.pop()
+        try:
+            entries = os.scandir(folder)
+        except OSError as e:
+            if folder == root:
+                raise IOError(f"Could not read directory '{root}': {e}")
+            print(f"Skipping unreadable directory {folder}: {e}")
+            continue
+
+        subfolders = []
+        with entries:
+            for entry in entries:
+                rel_path = f"{rel_folder}{entry.name}"
+                try:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        if not _matches_any(entry.name, rel_path, exclude):
+                            subfolders.append((entry.path, f"{rel_path}/"))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if _matches_any(entry.name, rel_path, include) and not _matches_any(entry.name, rel_path, exclude):
+                    yield entry.path
+
+        # Reversed so sub-folders are visited in the order they were listed
+        stack.extend(reversed(subfolders))
+
+def _selection(config):
+    """
+    The (include, exclude, extensions, any_extension) rules that pick input
+    files from a folder or members from an archive (see iter_target_files)
+    """
+    input_format = config["input_format"]
+    if input_format == "auto":
+        extensions = tuple(f".{fmt}" for fmt in INPUT_FORMATS)
+    else:
+        extensions = (f".{input_format}",)
+    # Without --include every file is a candidate, and the extension check
+    # (case-insensitive, so A.VTT counts) picks the inputs
+    include = config.get("include") or ["*"]
+    exclude = config.get("exclude") or []
+    any_extension = bool(input_format == "auto" and config.get("include"))
+    return include, exclude, extensions, any_extension
+
+def _member_filter(config):
+    """
+    Predicate picking the members of an input archive, with the same rules
+    as a recursive folder scan: members inside an excluded folder are
+    skipped, and paths are matched relative to the archive's root.
+    """
+    include, exclude, extensions, any_extension = _selection(config)
+
+    def select(name):
+        parts = name.split("/")
+        for depth in range(1, len(parts)):
+            if _matches_any(parts[depth - 1], "/".join(parts[:depth]), exclude):
+                return False
+        if not _matches_any(parts[-1], name, include) or _matches_any(parts[-1], name, exclude):
+            return False
+        return any_extension or name.lower().endswith(extensions)
+
+    return select
+
+def iter_target_files(config):
+    """
+    Lazily yield the input files selected by the config.
+
+    Directories are scanned with os.scandir, descending into sub-folders
+    when config["recursive"] is set. config["include"] / config["exclude"]
+    are optional lists of glob patterns; by default every file with the
+    input format's extension, in any letter case, is included.
+
+    With input_format "auto" the default is every .json, .vtt and .srt
+    file, and files matched by an explicit include pattern are taken
+    whatever their extension; each file's format is sniffed on conversion.
     """
-    
-    # --- 1. Get all target files ---
     input_path = config["input_path"]
     input_format = config["input_format"]
-    extension = f".{input_format}"
-    
-    target_files = []
+    include, exclude, extensions, any_extension = _selection(config)
+
     if config["is_directory"]:
-        try:
-            target_files = [
-                os.path.join(input_path, f)
-                for f in os.listdir(input_path)
-                if f.lower().endswith(extension)
-            ]
-        except Exception as e:
-            raise IOError(f"Could not read directory '{input_path}': {e}")
+        for path in _walk_files(input_path, config.get("recursive"), include, exclude):
+            if any_extension or path.lower().endswith(extensions):
+                yield path
     else:
-        if not input_path.lower().endswith(extension):
+        if input_format != "auto" and not input_path.lower().endswith(extensions):
             raise ValueError(f"Selected file must be a {input_format.upper()} file!")
-        target_files = [input_path]
+        yield input_path
+
+def _prefetch(iterable, maxsize=10000):
+    """
+    Run a (slow) generator such as a directory walk in a background thread,
+    buffering up to maxsize items, so it keeps going while files convert.
+    Exceptions raised by the generator are re-raised in the caller.
+    """
+    items = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(("item", item)):
+                    return
+            put(("done", None))
+        except BaseException as e:
+            put(("error", e))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = items.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
+
+def _remove_outputs(output_dir, outputs, progress_callback, current, total):
+    """Delete stale outputs (paths relative to output_dir)"""
+    for output in outputs:
+        try:
+            os.remove(os.path.join(output_dir, output))
+        except FileNotFoundError:
+            continue
+        if progress_callback:
+            progress_callback(current, total, f"Removed stale output: {output}")
+
+def _is_up_to_date(manifest, input_file, config):
+    """True if incremental mode is on and the file's outputs are current"""
+    if manifest is None:
+        return False
+    try:
+        return manifest.is_current(input_file, get_relative_outputs(input_file, config))
+    except OSError:
+        return False
+
+class _OutputClaims:
+    """
+    The output files claimed so far in a batch, so an input that would
+    overwrite another input's outputs (e.g. c0.json and c0.vtt with -f auto,
+    or any two files with a custom name) fails instead of replacing them.
+    """
+
+    def __init__(self):
+        self.owners = {}
+
+    def claim(self, input_name, outputs):
+        """Record input_name as the writer of outputs; raises ValueError if another input has one of them"""
+        for output in outputs:
+            owner = self.owners.get(output)
+            if owner is not None and owner != input_name:
+                raise ValueError(f"{output} is already written by {owner}; rename or exclude one of the two inputs")
+        for output in outputs:
+            self.owners[output] = input_name
+
+def run_conversion(config, progress_callback=None, metrics_callback=None, cancel_event=None):
+    """
+    Runs the full conversion process based on a config dictionary.
+    
+    The progress_callback (if provided) will be called with:
+    (current_file_index, total_files, message)
 
-    if not target_files:
-        raise FileNotFoundError(f"No {input_format.upper()} files found.")
+    Set config["workers"] to a number greater than 1 to convert files in
+    parallel using a process pool, and config["streaming"] to write outputs
+    cue by cue instead of building each file in memory first.
 
-    # --- 2. Process each file ---
-    total_files = len(target_files)
-    for i, input_file in enumerate(target_files):
+    Input folders are scanned lazily (recursively with config["recursive"],
+    filtered by the config["include"] / config["exclude"] globs), so
+    conversion starts with the first file found and total_files grows as
+    the scan goes on.
+
+    With config["incremental"] set, a manifest in the output directory is
+    used to skip files whose outputs are already current and to delete
+    outputs that are no longer produced.
+
+    The metrics_callback (if provided, e.g. a metrics.MetricsCollector) is
+    called with each converted file's metrics dict: bytes read, cue count
+    and wall time for read, parse and each format's generation and write.
+
+    The cancel_event (if provided, e.g. a threading.Event set from a GUI
+    thread) stops the batch between files: once it is set no new file is
+    started, files already in flight finish and are recorded, and the
+    function returns after reporting "Conversion cancelled".
+
+    input_path may also be a zip or tar archive (.zip, .tar, .tar.gz...),
+    and output_dir an archive name to write the outputs into; see
+    _run_archive_conversion.
+    """
+    if _uses_archive(config):
+        return _run_archive_conversion(config, progress_callback, metrics_callback, cancel_event)
+
+    output_dir = config["output_dir"]
+    manifest = None
+    if config.get("incremental"):
+        manifest = Manifest.load(output_dir, config)
+
+    # --- 1. Discover target files (in the background, while converting) ---
+    counts = {"found": 0, "converted": 0, "skipped": 0, "failed": 0}
+
+    def discover():
+        for input_file in iter_target_files(config):
+            counts["found"] += 1
+            yield input_file
+
+    def report_error(i, input_file, file_metrics):
+        # Log and continue with other files
         filename = os.path.basename(input_file)
-        
+        error = file_metrics["error"]
+        counts["failed"] += 1
+        print(f"Error processing {filename}: {error}")
         if progress_callback:
-            progress_callback(i, total_files, f"Processing {i+1}/{total_files}: {filename}")
+            progress_callback(i, counts["found"], f"Error on {filename}: {error}")
+        if manifest is not None:
+            manifest.forget(input_file)
 
-        try:
-            # --- 3. Parse content ---
-            with open(input_file, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            if input_format == "json":
-                data = json.loads(content)
-                subtitles = formats.convert_json_to_subtitles(data)
-            else: # vtt
-                subtitles = formats.parse_vtt(content)
-
-            # --- 4. Get output name ---
-            output_base = get_output_filename(
-                input_file,
-                config["naming_strategy"],
-                config["custom_name"],
-                config["suffix_text"],
-            )
-
-            # --- 5. Save all formats ---
-            save_output_files(subtitles, config["output_dir"], output_base, config)
-        
-        except Exception as e:
-            # Log and continue with other files
-            print(f"Error processing {filename}: {str(e)}")
+    # --- 2. Skip files that are already up to date, or whose outputs clash ---
+    claims = _OutputClaims()
+
+    def plan_jobs():
+        for i, input_file in enumerate(_prefetch(discover())):
+            if _is_cancelled(cancel_event):
+                return
+            try:
+                claims.claim(input_file, get_relative_outputs(input_file, config))
+            except ValueError as e:
+                file_metrics = new_file_metrics(input_file)
+                file_metrics["error"] = str(e)
+                if metrics_callback:
+                    metrics_callback(file_metrics)
+                report_error(i, input_file, file_metrics)
+                continue
+            if _is_up_to_date(manifest, input_file, config):
+                counts["skipped"] += 1
+                if progress_callback:
+                    total_files = counts["found"]
+                    filename = os.path.basename(input_file)
+                    progress_callback(i, total_files, f"Skipping {i+1}/{total_files}: {filename} (up to date)")
+                continue
+            yield i, input_file
+
+    # --- 3. Process each file ---
+    workers = config.get("workers") or 1
+    run_outputs = _RunOutputs(config, manifest, progress_callback)
+    try:
+        for i, input_file, get_result in _dispatch(plan_jobs(), config, workers, run_outputs.batch):
+            filename = os.path.basename(input_file)
+            total_files = counts["found"]
+
+            if progress_callback:
+                progress_callback(i, total_files, f"Processing {i+1}/{total_files}: {filename}")
+
+            file_metrics = get_result()
+            if metrics_callback:
+                metrics_callback(file_metrics)
+            if file_metrics["error"] is not None:
+                report_error(i, input_file, file_metrics)
+                continue
+
+            counts["converted"] += 1
+            run_outputs.finished(input_file, i, total_files)
+        run_outputs.publish()
+
+        total_files = counts["found"]
+        cancelled = _is_cancelled(cancel_event)
+        if not total_files and not cancelled:
+            raise FileNotFoundError(f"No {format_label(config['input_format'])} files found.")
+
+        if manifest is not None and not cancelled:
+            stale = manifest.remove_missing_inputs()
+            _remove_outputs(output_dir, stale, progress_callback, total_files, total_files)
+    except BaseException:
+        run_outputs.abort()
+        raise
+    finally:
+        if manifest is not None:
+            manifest.save()
+
+    message = _final_message(counts, manifest, cancelled)
+    if progress_callback:
+        progress_callback(total_files, total_files, message)
+
+def _uses_archive(config):
+    """True if the input is an archive file or the outputs go into one"""
+    output_dir = config["output_dir"]
+    return archives.is_archive(config["input_path"]) or (
+        archives.is_archive_name(output_dir) and not os.path.isdir(output_dir)
+    )
+
+class _FileSource:
+    """An input file for convert_many, only read when its contents are needed"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        return _read_input(self.path)[0]
+
+def _iter_input_files(config):
+    """convert_many items for the input files, named relative to the input folder as in get_output_base"""
+    for input_file in iter_target_files(config):
+        if config.get("recursive") and config["is_directory"]:
+            name = os.path.relpath(input_file, config["input_path"])
+        else:
+            name = os.path.basename(input_file)
+        yield name, _FileSource(input_file)
+
+def _write_output_bytes(outputs, config, batch=None):
+    """Write convert_many's {output name: bytes} under the output directory as one OutputBatch (see _file_batch)"""
+    with _file_batch(config, batch) as file_batch:
+        for output_name, data in outputs.items():
+            if os.linesep != "\n":
+                data = data.replace(b"\n", os.linesep.encode())  # As OutputBatch.write would
+            file_batch.write_bytes(os.path.join(config["output_dir"], output_name), data)
+
+def _run_archive_conversion(config, progress_callback, metrics_callback, cancel_event):
+    """
+    run_conversion for an archive input and/or output.
+
+    An input archive is read front to back in one pass (one decompression
+    stream for a tarball): the members picked by the extension and the
+    include/exclude globs are read into memory and go straight to the
+    parsers through convert_many, so nothing is extracted to disk. Output
+    names keep each member's folders.
+
+    If output_dir has an archive suffix (and isn't an existing folder) the
+    outputs are appended to that archive as each input finishes, so the
+    whole batch is one sequential read and one sequential write; the
+    archive only replaces any previous one once it is complete. Inputs may
+    then also come from a file or folder.
+
+    Parallel workers and the callbacks work as in run_conversion.
+    Incremental mode needs per-file timestamps and isn't supported, and
+    streaming mode doesn't apply since each member is read whole.
+    """
+    if config.get("incremental"):
+        raise ValueError("Incremental mode does not work with archives")
+
+    input_path = config["input_path"]
+    output_dir = config["output_dir"]
+    counts = {"found": 0, "converted": 0, "failed": 0}
+
+    if archives.is_archive(input_path):
+        items = archives.iter_members(input_path, _member_filter(config))
+    else:
+        items = _iter_input_files(config)
+
+    def discover():
+        for item in items:
+            if _is_cancelled(cancel_event):
+                return
+            counts["found"] += 1
+            yield item
+
+    claims = _OutputClaims()
+    with ExitStack() as stack:
+        archive = None
+        if archives.is_archive_name(output_dir) and not os.path.isdir(output_dir):
+            archive = stack.enter_context(archives.ArchiveWriter(output_dir, fsync=bool(config.get("fsync"))))
+        run_outputs = stack.enter_context(_RunOutputs(config))
+
+        for i, (name, outputs, file_metrics) in enumerate(convert_many(discover(), config)):
+            filename = os.path.basename(name)
+            total_files = counts["found"]
             if progress_callback:
-                progress_callback(i, total_files, f"Error on {filename}: {e}")
-            
+                progress_callback(i, total_files, f"Processing {i+1}/{total_files}: {filename}")
+
+            if file_metrics["error"] is None:
+                began = time.perf_counter()
+                try:
+                    claims.claim(name, list(outputs))
+                    if archive is not None:
+                        for output_name, data in outputs.items():
+                            archive.add(output_name, data)
+                    else:
+                        _write_output_bytes(outputs, config, run_outputs.batch)
+                except Exception as e:
+                    file_metrics["error"] = str(e)
+                file_metrics["write_s"]["archive" if archive is not None else "files"] = time.perf_counter() - began
+                file_metrics["total_s"] += time.perf_counter() - began
+            if metrics_callback:
+                metrics_callback(file_metrics)
+
+            error = file_metrics["error"]
+            if error is not None:
+                counts["failed"] += 1
+                print(f"Error processing {filename}: {error}")
+                if progress_callback:
+                    progress_callback(i, total_files, f"Error on {filename}: {error}")
+                continue
+            counts["converted"] += 1
+            if archive is None:
+                run_outputs.finished(name, i, total_files)
+
+        total_files = counts["found"]
+        cancelled = _is_cancelled(cancel_event)
+        if not total_files and not cancelled:
+            raise FileNotFoundError(f"No {format_label(config['input_format'])} files found.")
+
+    message = _final_message(counts, None, cancelled)
+    if progress_callback:
+        progress_callback(total_files, total_files, message)
+
+def _is_cancelled(cancel_event):
+    """True once the (optional) cancel event of a batch has been set"""
+    return cancel_event is not None and cancel_event.is_set()
+
+def _final_message(counts, manifest, cancelled):
+    """The last progress message of a batch"""
+    if cancelled:
+        return f"Conversion cancelled ({counts['converted']} converted, {counts['failed']} failed)."
+    message = "Conversion complete!"
+    if manifest is not None:
+        message += f" ({counts['converted']} converted, {counts['skipped']} skipped, {counts['failed']} failed)"
+    return message
+
+def _read_input(path):
+    """Read a whole input file as undecoded bytes, returning (data, size in bytes)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return data, len(data)
+
+def _file_batch(config, batch=None):
+    """
+    The OutputBatch for one input's outputs: nested in batch (a run's
+    batch, which publishes them later) if given, else a batch of its own
+    """
+    return batch.nested() if batch is not None else output_batch(config)
+
+def _write_outputs(rendered, output_base, config, batch=None):
+    """
+    Write {extension: text} outputs as one OutputBatch (see _file_batch),
+    returning the write time per extension plus the time to publish them
+    (or hand them to batch) under "commit"
+    """
+    write_times = {}
+    with _file_batch(config, batch) as file_batch:
+        for ext, content in rendered.items():
+            began = time.perf_counter()
+            file_batch.write(get_output_path(config["output_dir"], output_base, ext, config), content)
+            write_times[ext] = time.perf_counter() - began
+        began = time.perf_counter()
+        file_batch.commit()
+        write_times["commit"] = time.perf_counter() - began
+    return write_times
+
+# A batch run publishes its outputs (renames them into place, after one
+# grouped sync with --fsync) at least this often, and when it ends
+PUBLISH_INTERVAL_S = 1.0
+
+class _RunOutputs:
+    """
+    The OutputBatch shared by all inputs of a run. Each input writes
+    through a nested batch; publish() commits the run's batch every
+    PUBLISH_INTERVAL_S and at the end. Inputs are only recorded in the
+    manifest (and their stale outputs removed) once their outputs are
+    published, so an interrupted run never lists an input whose outputs
+    aren't in place. Used as a context manager it publishes on success and
+    discards the unpublished outputs on error.
+    """
+
+    def __init__(self, config, manifest=None, progress_callback=None):
+        self.batch = output_batch(config)
+        self.config = config
+        self.manifest = manifest
+        self.progress_callback = progress_callback
+        self.unpublished = []  # (input file, current, total) of inputs written since the last publish
+        self.last_publish = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.publish()
+        else:
+            self.abort()
+        return False
+
+    def finished(self, input_file, current, total):
+        """Note an input whose outputs are in the batch, publishing if it is time"""
+        self.unpublished.append((input_file, current, total))
+        if time.monotonic() - self.last_publish >= PUBLISH_INTERVAL_S:
+            self.publish()
+
+    def publish(self):
+        unpublished, self.unpublished = self.unpublished, []
+        self.batch.commit()
+        self.last_publish = time.monotonic()
+        if self.manifest is None:
+            return
+        for input_file, current, total in unpublished:
+            stale = self.manifest.record(input_file, get_relative_outputs(input_file, self.config))
+            _remove_outputs(self.config["output_dir"], stale, self.progress_callback, current, total)
+
+    def abort(self):
+        """Discard everything not yet published"""
+        self.unpublished = []
+        self.batch.abort()
+
+async def run_conversion_async(config, progress_callback=None, metrics_callback=None, cancel_event=None):
+    """
+    Asyncio variant of run_conversion for I/O-bound batches (e.g. inputs on
+    a slow network mount).
+
+    Up to config["concurrency"] files (default 16) are read and written at
+    once on a thread pool, so their I/O latency overlaps. Parsing and
+    rendering run on a separate executor: a process pool when
+    config["workers"] > 1, otherwise one background thread, so the event
+    loop never blocks on CPU work. Recursive scanning and incremental mode
+    work as in run_conversion; streaming mode does not apply because each
+    input is read in full (as bytes, decoded only where the parser needs it).
+
+    The progress_callback, metrics_callback and cancel_event contracts are
+    the same as run_conversion's, with current_file_index being the number
+    of files finished so far. Archive inputs and outputs are read and
+    written sequentially anyway, so they are handed to run_conversion on a
+    background thread.
+    """
+    loop = asyncio.get_running_loop()
+    if _uses_archive(config):
+        return await loop.run_in_executor(
+            None, run_conversion, config, progress_callback, metrics_callback, cancel_event
+        )
+    concurrency = config.get("concurrency", 16)
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    workers = config.get("workers") or 1
+    output_dir = config["output_dir"]
+
+    manifest = None
+    if config.get("incremental"):
+        manifest = Manifest.load(output_dir, config)
+
+    counts = {"found": 0, "done": 0, "converted": 0, "skipped": 0, "failed": 0}
+    files = enumerate(iter_target_files(config))
+    next_lock = asyncio.Lock()
+    claims = _OutputClaims()
+
+    io_pool = ThreadPoolExecutor(max_workers=concurrency)
+    cpu_pool = _process_pool(workers) if workers > 1 else ThreadPoolExecutor(max_workers=1)
+    run_outputs = _RunOutputs(config, manifest, progress_callback)
+
+    def report(message):
+        if progress_callback:
+            progress_callback(counts["done"], counts["found"], message)
+
+    async def next_job():
+        # The directory walk is a generator, so only one task may advance it
+        async with next_lock:
+            while True:
+                if _is_cancelled(cancel_event):
+                    return None
+                job = await loop.run_in_executor(io_pool, next, files, None)
+                if job is None:
+                    return None
+                counts["found"] += 1
+                i, input_file = job
+                try:
+                    claims.claim(input_file, get_relative_outputs(input_file, config))
+                except ValueError as e:
+                    return i, input_file, str(e)
+                up_to_date = await loop.run_in_executor(io_pool, _is_up_to_date, manifest, input_file, config)
+                if not up_to_date:
+                    return i, input_file, None
+                counts["skipped"] += 1
+                counts["done"] += 1
+                report(f"Skipping {i+1}/{counts['found']}: {os.path.basename(input_file)} (up to date)")
+
+    async def worker():
+        while True:
+            job = await next_job()
+            if job is None:
+                return
+            i, input_file, clash = job
+            filename = os.path.basename(input_file)
+            report(f"Processing {i+1}/{counts['found']}: {filename}")
+
+            file_metrics = new_file_metrics(input_file)
+            began = time.perf_counter()
+            try:
+                if clash is not None:
+                    raise ValueError(clash)
+                content, file_metrics["bytes_read"] = await loop.run_in_executor(io_pool, _read_input, input_file)
+                file_metrics["read_s"] = time.perf_counter() - began
+                rendered, render_metrics = await loop.run_in_executor(cpu_pool, render_content, content, config)
+                file_metrics.update(render_metrics)
+                output_base = get_output_base(input_file, config)
+                write_times = await loop.run_in_executor(
+                    io_pool, _write_outputs, rendered, output_base, config, run_outputs.batch
+                )
+                file_metrics["write_s"] = write_times
+            except Exception as e:
+                file_metrics["error"] = str(e)
+            file_metrics["total_s"] = time.perf_counter() - began
+            if metrics_callback:
+                metrics_callback(file_metrics)
+
+            if file_metrics["error"] is not None:
+                # Log and continue with other files
+                e = file_metrics["error"]
+                counts["failed"] += 1
+                counts["done"] += 1
+                print(f"Error processing {filename}: {e}")
+                report(f"Error on {filename}: {e}")
+                if manifest is not None:
+                    manifest.forget(input_file)
+                continue
+
+            counts["converted"] += 1
+            counts["done"] += 1
+            run_outputs.finished(input_file, counts["done"], counts["found"])
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        run_outputs.publish()
+
+        total_files = counts["found"]
+        cancelled = _is_cancelled(cancel_event)
+        if not total_files and not cancelled:
+            raise FileNotFoundError(f"No {format_label(config['input_format'])} files found.")
+
+        if manifest is not None and not cancelled:
+            stale = manifest.remove_missing_inputs()
+            _remove_outputs(output_dir, stale, progress_callback, total_files, total_files)
+    except BaseException:
+        run_outputs.abort()
+        raise
+    finally:
+        io_pool.shutdown(wait=False)
+        cpu_pool.shutdown(wait=False)
+        if manifest is not None:
+            manifest.save()
+
+    message = _final_message(counts, manifest, cancelled)
     if progress_callback:
-        progress_callback(total_files, total_files, "Conversion complete!")
+        progress_callback(total_files, total_files, message)
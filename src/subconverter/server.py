@@ -0,0 +1,358 @@
+import argparse
+import http.server
+import multiprocessing
+import os
+import signal
+import socketserver
+import stat
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from . import decoders, formats, processor
+from .metrics import Histogram
+
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_MAX_BODY = 64 << 20
+
+# Response content type per output format
+CONTENT_TYPES = {
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+    "txt": "text/plain; charset=utf-8",
+    "json": "application/json",
+}
+
+def _init_worker():
+    """Worker start-up: leave Ctrl+C to the server process, which shuts the pool down"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def _interrupt(signum, frame):
+    """SIGTERM handler: stop the server the same way as Ctrl+C"""
+    raise KeyboardInterrupt
+
+def convert_body(body, input_format, output_format, options):
+    """
+    Worker task: convert one request body to one output format. Returns
+    (UTF-8 bytes, cue count).
+    """
+    config = dict(options, input_format=input_format)
+    for ext in formats.WRITERS:
+        config[f"export_{ext}"] = ext == output_format
+    rendered, metrics = processor.render_content(body, config)
+    return rendered[output_format].encode("utf-8"), metrics["cues"]
+
+class QueueFull(Exception):
+    """Raised by ConversionPool.run when no more work can be admitted"""
+
+class ConversionPool:
+    """
+    Pre-forked worker processes plus a bounded admission queue.
+
+    multiprocessing.Pool starts every worker up front, so no request pays
+    for process start-up or imports. At most workers + queue_size
+    conversions are admitted at once; run() raises QueueFull beyond that so
+    the server can push back instead of queueing without limit.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.pool = multiprocessing.Pool(workers, initializer=_init_worker)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def run(self, func, *args):
+        """
+        Run func(*args) on a worker and return its result, or raise
+        QueueFull at once if the pool is already at capacity.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return self.pool.apply_async(func, args).get()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+class ServerStats:
+    """Request counters and latency histograms, rendered for /metrics"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.requests = {}  # (output format, status) -> count
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cues = 0
+        self.latency = {ext: Histogram() for ext in formats.WRITERS}
+
+    def record(self, output_format, status, bytes_in, bytes_out, cues, seconds):
+        with self._lock:
+            key = (output_format, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cues += cues
+        if status == 200:
+            self.latency[output_format].observe(seconds)
+
+    def render(self, pool):
+        """Prometheus text exposition of the counters, gauges and histograms"""
+        uptime = time.time() - self.started
+        with self._lock:
+            requests = dict(self.requests)
+            bytes_in, bytes_out, cues = self.bytes_in, self.bytes_out, self.cues
+        total = sum(requests.values())
+        lines = [
+            "# HELP subconvert_requests_total Conversion requests by output format and status.",
+            "# TYPE subconvert_requests_total counter",
+        ]
+        for (output_format, status), count in sorted(requests.items()):
+            lines.append(f'subconvert_requests_total{{format="{output_format}",status="{status}"}} {count}')
+        lines += [
+            "# TYPE subconvert_received_bytes_total counter",
+            f"subconvert_received_bytes_total {bytes_in}",
+            "# TYPE subconvert_sent_bytes_total counter",
+            f"subconvert_sent_bytes_total {bytes_out}",
+            "# TYPE subconvert_cues_total counter",
+            f"subconvert_cues_total {cues}",
+            "# TYPE subconvert_uptime_seconds gauge",
+            f"subconvert_uptime_seconds {uptime:.3f}",
+            "# HELP subconvert_requests_per_second Average request throughput since start-up.",
+            "# TYPE subconvert_requests_per_second gauge",
+            f"subconvert_requests_per_second {total / uptime if uptime else 0.0:.3f}",
+            "# HELP subconvert_received_megabytes_per_second Average input throughput since start-up.",
+            "# TYPE subconvert_received_megabytes_per_second gauge",
+            f"subconvert_received_megabytes_per_second {bytes_in / 1e6 / uptime if uptime else 0.0:.3f}",
+            "# TYPE subconvert_in_flight gauge",
+            f"subconvert_in_flight {pool.in_flight}",
+            "# TYPE subconvert_capacity gauge",
+            f"subconvert_capacity {pool.capacity}",
+            "# TYPE subconvert_workers gauge",
+            f"subconvert_workers {pool.workers}",
+            "# HELP subconvert_request_duration_seconds Latency of successful conversions.",
+            "# TYPE subconvert_request_duration_seconds histogram",
+        ]
+        for output_format, histogram in self.latency.items():
+            counts, count, seconds = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'subconvert_request_duration_seconds_bucket{{format="{output_format}",le="{le}"}} {cumulative}'
+                )
+            lines.append(f'subconvert_request_duration_seconds_sum{{format="{output_format}"}} {seconds:.6f}')
+            lines.append(f'subconvert_request_duration_seconds_count{{format="{output_format}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+class ConversionHandler(http.server.BaseHTTPRequestHandler):
+    """
+    POST /convert?to=srt|vtt|txt|json[&from=json|vtt|srt|auto] with the
+    subtitle file as the body; GET /metrics and GET /health.
+
+    Connections are kept alive (HTTP/1.1), so a client can pipeline
+    requests: they are answered in order on the same connection.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "subconvert"
+
+    def address_string(self):
+        # Unix-socket peers have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="text/plain; charset=utf-8", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reject(self, status, message, headers=()):
+        """Send an error before the body was read: the connection can't be reused"""
+        self.close_connection = True
+        self._send(status, f"{message}\n".encode("utf-8"), headers=headers)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            body = self.server.stats.render(self.server.pool).encode("utf-8")
+            self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/health":
+            self._send(200, b"ok\n")
+        else:
+            self._reject(404, "Not found")
+
+    def do_POST(self):
+        began = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self._reject(404, "Not found")
+            return
+        params = parse_qs(url.query)
+        output_format = params.get("to", ["srt"])[0]
+        input_format = params.get("from", ["auto"])[0]
+        if output_format not in formats.WRITERS:
+            self._reject(400, f"Unknown output format: {output_format}")
+            return
+        if input_format not in ("auto", *processor.INPUT_FORMATS):
+            self._reject(400, f"Unknown input format: {input_format}")
+            return
+        if "chunked" in self.headers.get("Transfer-Encoding", ""):
+            self._reject(411, "Chunked bodies are not supported; send Content-Length")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._reject(411, "Content-Length required")
+            return
+        if length < 0:
+            self._reject(400, "Invalid Content-Length")
+            return
+        if length > self.server.max_body:
+            self._reject(413, f"Body larger than {self.server.max_body} bytes")
+            return
+
+        body = self.rfile.read(length)
+        cues = 0
+        try:
+            data, cues = self.server.pool.run(convert_body, body, input_format, output_format, self.server.options)
+        except QueueFull:
+            status, data = 503, b"Server busy, retry later\n"
+            self._send(status, data, headers=[("Retry-After", "1")])
+        except ValueError as e:
+            # Input that isn't valid subtitle data
+            status, data = 422, f"{e}\n".encode("utf-8")
+            self._send(status, data)
+        except Exception as e:
+            status, data = 500, f"{e}\n".encode("utf-8")
+            self._send(status, data)
+        else:
+            status = 200
+            self._send(status, data, CONTENT_TYPES[output_format])
+        self.server.stats.record(output_format, status, length, len(data), cues, time.perf_counter() - began)
+
+class _ServerMixin:
+    """State shared by the TCP and Unix-socket servers"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def setup_service(self, pool, options, max_body, access_log):
+        self.pool = pool
+        self.options = options
+        self.max_body = max_body
+        self.access_log = access_log
+        self.stats = ServerStats()
+
+class ConversionHTTPServer(_ServerMixin, http.server.ThreadingHTTPServer):
+    pass
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class UnixConversionHTTPServer(_ServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        pass
+else:  # No Unix sockets on this platform
+    UnixConversionHTTPServer = None
+
+def make_server(pool, options, host="127.0.0.1", port=DEFAULT_PORT, unix_socket=None,
+                max_body=DEFAULT_MAX_BODY, access_log=False):
+    """Create (but don't start) a server on a TCP address or, if given, a Unix socket path"""
+    if unix_socket:
+        if UnixConversionHTTPServer is None:
+            raise OSError("Unix sockets are not supported on this platform")
+        try:
+            mode = os.stat(unix_socket).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{unix_socket} exists and is not a socket")
+            os.remove(unix_socket)  # Left over from a previous run
+        server = UnixConversionHTTPServer(unix_socket, ConversionHandler)
+    else:
+        server = ConversionHTTPServer((host, port), ConversionHandler)
+    server.setup_service(pool, options, max_body, access_log)
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="subconvert serve",
+        description="Serve subtitle conversions over HTTP from a pool of warm worker processes."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT}).")
+    parser.add_argument("--unix", metavar="PATH", dest="unix_socket", help="Listen on a Unix socket instead of TCP (a stale socket at PATH is replaced, any other file is an error).")
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        dest="workers",
+        help="Worker processes, started up front (default: number of CPUs)."
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Requests that may wait for a worker before new ones get 503 (default: "
+             f"{DEFAULT_QUEUE_SIZE})."
+    )
+    parser.add_argument(
+        "--max-body",
+        type=int,
+        default=DEFAULT_MAX_BODY,
+        metavar="BYTES",
+        help=f"Largest accepted request body (default: {DEFAULT_MAX_BODY})."
+    )
+    parser.add_argument("--json-style", choices=["pretty", "compact"], default="pretty", help="Layout of JSON output.")
+    parser.add_argument(
+        "--json-decoder",
+        choices=["auto", *decoders.JSON_DECODERS],
+        default="auto",
+        help="Backend for decoding JSON input (default: auto)."
+    )
+    parser.add_argument("--access-log", action="store_true", help="Log every request to stderr.")
+    args = parser.parse_args(argv)
+
+    if args.json_decoder != "auto" and args.json_decoder not in decoders.available_json_decoders():
+        parser.error(f"JSON decoder '{args.json_decoder}' is not installed")
+
+    options = {"json_style": args.json_style, "json_decoder": args.json_decoder}
+    pool = ConversionPool(max(1, args.workers), max(0, args.queue_size))
+    try:
+        try:
+            server = make_server(
+                pool, options, args.host, args.port, args.unix_socket, args.max_body, args.access_log
+            )
+        except OSError as e:
+            parser.error(str(e))
+        signal.signal(signal.SIGTERM, _interrupt)
+        where = args.unix_socket or f"http://{args.host}:{server.server_address[1]}"
+        print(f"Serving on {where} with {pool.workers} workers (Ctrl+C to stop).")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nShutting down.")
+        finally:
+            server.server_close()
+            if args.unix_socket and os.path.exists(args.unix_socket):
+                os.remove(args.unix_socket)
+    finally:
+        pool.close()
+    return 0
@@ -0,0 +1,175 @@
+from functools import partial
+from . import formats
+
+# Merged cues stay within two 42-character lines (the usual broadcast
+# limit) unless --max-line-length and --max-lines give another budget
+MERGE_MAX_CHARS = 84
+
+# Config keys read by build_pipeline and the values that leave a stage off
+# (the same as leaving the key out)
+TRANSFORM_DEFAULTS = {
+    "clip_start_ms": None,
+    "clip_end_ms": None,
+    "clip_rebase": False,
+    "shift_ms": 0,
+    "scale": 1.0,
+    "merge_gap_ms": None,
+    "fix_overlaps": False,
+    "max_line_length": None,
+    "max_lines": None,
+}
+
+def retime(cues, shift_ms=0, scale=1.0):
+    """
+    Scale every timestamp by scale, then add shift_ms (which may be
+    negative). Times are clamped at zero and cues that end up entirely
+    before zero are dropped.
+    """
+    for cue in cues:
+        end = round(cue["end"] * scale) + shift_ms
+        if end <= 0:
+            continue
+        cue["start"] = max(0, round(cue["start"] * scale) + shift_ms)
+        cue["end"] = end
+        yield cue
+
+def merge(cues, gap_ms, max_chars=MERGE_MAX_CHARS):
+    """
+    Join each cue onto the previous one when it starts at most gap_ms
+    after the previous one ends (overlapping cues always qualify) and the
+    joined text is at most max_chars long. Blank cues are absorbed into
+    their neighbour. Texts are joined with a space.
+    """
+    pending = None
+    for cue in cues:
+        if pending is not None and cue["start"] - pending["end"] <= gap_ms:
+            head = pending["text"].rstrip()
+            tail = cue["text"].lstrip()
+            text = f"{head} {tail}" if head and tail else head or tail
+            if len(text) <= max_chars or not (head and tail):
+                pending["text"] = text
+                pending["end"] = max(pending["end"], cue["end"])
+                continue
+        if pending is not None:
+            yield pending
+        pending = cue
+    if pending is not None:
+        yield pending
+
+def _wrap_line(line, width):
+    """Greedily break one line at spaces into lines of at most width characters"""
+    lines = []
+    current = ""
+    for word in line.split():
+        if not current:
+            current = word
+        elif len(current) + 1 + len(word) <= width:
+            current = f"{current} {word}"
+        else:
+            lines.append(current)
+            current = word  # A word longer than width stays whole
+    if current:
+        lines.append(current)
+    return lines
+
+def wrap(cues, width):
+    """
+    Re-wrap any line longer than width characters at word boundaries.
+    Shorter lines, including deliberate breaks such as one line per
+    speaker, are left as they are.
+    """
+    for cue in cues:
+        lines = cue["text"].split("\n")
+        if any(len(line) > width for line in lines):
+            wrapped = []
+            for line in lines:
+                wrapped.extend(_wrap_line(line, width) if len(line) > width else [line])
+            cue["text"] = "\n".join(wrapped)
+        yield cue
+
+def split(cues, max_lines):
+    """
+    Split cues with more than max_lines lines into consecutive cues of at
+    most max_lines lines each, sharing the original duration in proportion
+    to their length.
+    """
+    for cue in cues:
+        lines = cue["text"].strip().split("\n")
+        if len(lines) <= max_lines:
+            yield cue
+            continue
+        chunks = ["\n".join(lines[i:i + max_lines]) for i in range(0, len(lines), max_lines)]
+        start, end = cue["start"], cue["end"]
+        total = sum(len(chunk) for chunk in chunks) or 1
+        done = 0
+        for chunk in chunks[:-1]:
+            done += len(chunk)
+            boundary = start + (end - start) * done // total
+            yield {"start": start, "end": boundary, "text": chunk}
+            start = boundary
+        yield {"start": start, "end": end, "text": chunks[-1]}
+
+def fix_overlaps(cues):
+    """
+    Trim each cue so it ends no later than the next one starts (one cue of
+    lookahead). A cue is never trimmed to before its own start.
+    """
+    previous = None
+    for cue in cues:
+        if previous is not None:
+            if previous["end"] > cue["start"]:
+                previous["end"] = max(previous["start"], cue["start"])
+            yield previous
+        previous = cue
+    if previous is not None:
+        yield previous
+
+def build_pipeline(config):
+    """
+    The transform stages enabled in config, in the order they run: the
+    time window (config["clip_start_ms"], config["clip_end_ms"] and
+    config["clip_rebase"], see formats.clip_cues), retime
+    (config["shift_ms"], config["scale"]), merge (config["merge_gap_ms"]),
+    fix_overlaps (config["fix_overlaps"]), wrap (config["max_line_length"])
+    and split (config["max_lines"]). Each stage is a callable that takes an
+    iterable of cues and returns an iterator of cues.
+    """
+    stages = []
+    clip_start = config.get("clip_start_ms")
+    clip_end = config.get("clip_end_ms")
+    if clip_start is not None or clip_end is not None:
+        # First, on the source timeline; stops the parser past the window
+        stages.append(partial(
+            formats.clip_cues, start=clip_start, end=clip_end, rebase=bool(config.get("clip_rebase"))
+        ))
+
+    shift_ms = config.get("shift_ms") or 0
+    scale = config.get("scale") or 1.0
+    if shift_ms or scale != 1.0:
+        stages.append(partial(retime, shift_ms=shift_ms, scale=scale))
+
+    width = config.get("max_line_length")
+    max_lines = config.get("max_lines")
+    if config.get("merge_gap_ms") is not None:
+        max_chars = width * max_lines if width and max_lines else MERGE_MAX_CHARS
+        stages.append(partial(merge, gap_ms=config["merge_gap_ms"], max_chars=max_chars))
+    if config.get("fix_overlaps"):
+        # Before splitting, which only divides a cue's own (trimmed) span
+        stages.append(fix_overlaps)
+    if width:
+        stages.append(partial(wrap, width=width))
+    if max_lines:
+        stages.append(partial(split, max_lines=max_lines))
+    return stages
+
+def apply_transforms(cues, config):
+    """
+    Chain the stages enabled in config onto a stream of subtitle
+    dictionaries, as the parsers yield them. The stages are generators that
+    edit the cues in place, so the whole pipeline runs in the same single
+    pass as parsing, holding at most a cue or two at a time. With no
+    transform options set the cues are returned untouched.
+    """
+    for stage in build_pipeline(config):
+        cues = stage(cues)
+    return cues
@@ -0,0 +1,163 @@
+import itertools
+import os
+import threading
+
+# Large enough that a typical subtitle file goes to disk in one write() call
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+_temp_ids = itertools.count()
+# File contents only need their data (and size) on disk before the rename
+_sync_data = getattr(os, "fdatasync", os.fsync)
+
+def _temp_path(path):
+    """Hidden temporary name next to path, unique per process and call"""
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f".{name}.{os.getpid()}.{next(_temp_ids)}.tmp")
+
+class OutputBatch:
+    """
+    A group of output files that are written and then published together.
+
+    Each file is written through a large buffer to a temporary file next to
+    its destination. commit() renames them all into place, so an interrupted
+    conversion leaves either the previous outputs or the complete new ones,
+    never a truncated file. With fsync=True the temporary files are flushed
+    to disk as a group before the renames, and each folder is synced once
+    after them. Each output folder is created at most once per batch.
+
+    A batch run writes every input through a nested() batch of one run-wide
+    batch, which publishes the inputs' files in groups. Used as a context
+    manager, a batch commits on success and removes its temporary files on
+    error.
+    """
+
+    def __init__(self, fsync=False, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.fsync = fsync
+        self.buffer_size = buffer_size
+        self.pending = []  # (temporary path, final path)
+        self.parent = None
+        self.known_dirs = set()  # Folders already created (or found) by this batch
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def nested(self):
+        """
+        A batch for one input's outputs, sharing this batch's folder cache,
+        whose commit() hands its files over to this batch instead of
+        publishing them (abort() still discards them)
+        """
+        child = OutputBatch(self.fsync, self.buffer_size)
+        child.parent = self
+        child.known_dirs = self.known_dirs
+        child._lock = self._lock
+        return child
+
+    def adopt(self, pending):
+        """
+        Take over finished (temporary path, final path) pairs from a nested
+        batch or from detach() in another process, to publish them with
+        this batch's next commit() (safe to call from any thread)
+        """
+        with self._lock:
+            self.pending.extend(pending)
+
+    def detach(self):
+        """Hand back the files written so far without publishing them, as for adopt()"""
+        with self._lock:
+            pending, self.pending = self.pending, []
+        return pending
+
+    def _ensure_dir(self, folder):
+        """os.makedirs(folder, exist_ok=True), at most once per folder per batch"""
+        if not folder or folder in self.known_dirs:
+            return
+        os.makedirs(folder, exist_ok=True)
+        with self._lock:
+            self.known_dirs.add(folder)
+
+    def _create(self, path, mode, buffering):
+        """Create the temporary file for path (making its folder first) and queue it"""
+        folder = os.path.dirname(path)
+        self._ensure_dir(folder)
+        temp_path = _temp_path(path)
+        encoding = None if "b" in mode else "utf-8"
+        try:
+            f = open(temp_path, mode, buffering=buffering, encoding=encoding)
+        except FileNotFoundError:
+            # The folder was removed since it was created; make it again
+            with self._lock:
+                self.known_dirs.discard(folder)
+            self._ensure_dir(folder)
+            f = open(temp_path, mode, buffering=buffering, encoding=encoding)
+        with self._lock:
+            self.pending.append((temp_path, path))
+        return f
+
+    def open(self, path, binary=False):
+        """
+        Open a text (or binary) file that will become path on commit(). The
+        caller must close it (e.g. with a with block) before committing.
+        """
+        return self._create(path, "wb" if binary else "w", self.buffer_size)
+
+    def write(self, path, text):
+        """Write a whole output file, encoded once and handed to the OS in one call"""
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)  # As text mode would
+        self.write_bytes(path, text.encode("utf-8"))
+
+    def write_bytes(self, path, data):
+        """Write a whole output file from bytes that are already encoded"""
+        with self._create(path, "wb", 0) as f:
+            data = memoryview(data)
+            while data:
+                data = data[f.write(data):]
+
+    def commit(self):
+        """
+        Move every written file into place (after syncing them, if enabled),
+        or for a nested batch, hand them to its parent
+        """
+        pending = self.detach()
+        if self.parent is not None:
+            self.parent.adopt(pending)
+            return
+        if self.fsync:
+            for temp_path, _ in pending:
+                fd = os.open(temp_path, os.O_RDONLY)
+                try:
+                    _sync_data(fd)
+                finally:
+                    os.close(fd)
+        for temp_path, path in pending:
+            os.replace(temp_path, path)
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            # Make the renames themselves durable (not possible on Windows)
+            for folder in {os.path.dirname(path) or os.curdir for _, path in pending}:
+                fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def abort(self):
+        """Delete the temporary files of everything not yet committed"""
+        pending = self.detach()
+        for temp_path, _ in pending:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+def output_batch(config):
+    """An OutputBatch set up from the config ("fsync")"""
+    return OutputBatch(fsync=bool(config.get("fsync")))
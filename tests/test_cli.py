@@ -0,0 +1,39 @@
+import argparse
+import pytest
+from subconverter import cli
+
+@pytest.mark.parametrize("value, expected", [
+    ("90", 90000),
+    ("1:30.5", 90500),
+    ("1:00:00", 3600000),
+])
+def test_time_ms(value, expected):
+    assert cli._time_ms(value) == expected
+
+@pytest.mark.parametrize("value", ["inf", "nan", "1:inf", "-5", "1:2:3:4", "abc"])
+def test_time_ms_rejects_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli._time_ms(value)
+
+def test_factor():
+    assert cli._factor("2") == 2.0
+    assert cli._factor("25/25") == 1.0
+
+@pytest.mark.parametrize("value", ["0", "-1", "inf", "nan", "1/0", "x"])
+def test_factor_rejects_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli._factor(value)
+
+@pytest.mark.parametrize("option", [["--concurrency", "0"], ["--concurrency", "-2"], ["-j", "0"]])
+def test_worker_counts_must_be_positive(tmp_path, option, capsys):
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path), "-o", str(tmp_path / "out"), *option])
+    assert "must be at least 1" in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
+
+@pytest.mark.parametrize("option", [["--scale", "nan"], ["--scale", "inf"], ["--from", "inf"], ["--to", "nan"]])
+def test_non_finite_transform_values_are_rejected(tmp_path, option, capsys):
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path), "-o", str(tmp_path / "out"), *option])
+    assert "invalid" in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from subconverter import cli, formats, transforms
+
+def _vtt(cues):
+    blocks = [f"{formats.ms_to_vtt_time(start)} --> {formats.ms_to_vtt_time(end)}\n{text}\n" for start, end, text in cues]
+    return ("WEBVTT\n\n" + "\n".join(blocks)).encode("utf-8")
+
+def _srt(cues):
+    blocks = [
+        f"{i}\r\n{formats.ms_to_srt_time(start)} --> {formats.ms_to_srt_time(end)}\r\n{text}\r\n"
+        for i, (start, end, text) in enumerate(cues, 1)
+    ]
+    return "\r\n".join(blocks).encode("utf-8")
+
+def _long_cue_document():
+    # One cue spanning the first hour, then one cue a second; big enough
+    # that seeking bisects instead of scanning from the top
+    return [(0, 3600000, "long")] + [(s * 1000, s * 1000 + 1000, f"x{s}") for s in range(4000)]
+
+def _reference(cues, start, end, rebase=False):
+    table = formats.CueTable.from_cues({"start": s, "end": e, "text": t} for s, e, t in cues)
+    return list(formats.CueIndex(table).clip(start, end, rebase))
+
+@pytest.mark.parametrize("render, scan", [
+    (_vtt, formats.iter_vtt_cues_bytes),
+    (_srt, formats.iter_srt_cues_bytes),
+])
+def test_seek_keeps_long_cue_still_on_screen(render, scan):
+    cues = _long_cue_document()
+    buffer = render(cues)
+    start, end = 3000000, 3002000
+    clipped = list(formats.clip_cues(scan(buffer, start_ms=start), start, end))
+    assert [cue["text"] for cue in clipped] == ["long", "x3000", "x3001"]
+    assert clipped == _reference(cues, start, end)
+
+def test_seek_looks_back_a_bounded_stretch(monkeypatch):
+    # The hour-long cue started 50 minutes before the window: past a
+    # 10-minute lookback, so only the cues from there on are read
+    monkeypatch.setattr(formats, "SEEK_LOOKBACK_MS", 600000)
+    buffer = _vtt(_long_cue_document())
+    start = 3000000
+    assert formats._seek_offset(buffer, start) > 0
+    clipped = formats.clip_cues(formats.iter_vtt_cues_bytes(buffer, start_ms=start), start, start + 2000)
+    assert [cue["text"] for cue in clipped] == ["x3000", "x3001"]
+
+def test_cli_window_keeps_long_cue(tmp_path):
+    source = tmp_path / "long.vtt"
+    source.write_bytes(_vtt(_long_cue_document()))
+    output = tmp_path / "out"
+    cli.main([str(source), "-o", str(output), "--srt", "-f", "vtt", "--from", "3000", "--to", "3002"])
+    srt = (output / "long.srt").read_text(encoding="utf-8")
+    assert [block.split("\n")[2] for block in srt.strip().split("\n\n")] == ["long", "x3000", "x3001"]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_seek_matches_cue_index_on_overlapping_cues(seed):
+    rng = random.Random(seed)
+    cues = []
+    start = 0
+    for i in range(5000):
+        start += rng.randrange(0, 2000)
+        # Mostly short cues, now and then one that stays up for minutes
+        length = rng.randrange(1, 600000) if rng.random() < 0.01 else rng.randrange(1, 4000)
+        cues.append((start, start + length, f"c{i}"))
+    buffer = _vtt(cues)
+    for _ in range(20):
+        window_start = rng.randrange(0, start)
+        window_end = window_start + rng.randrange(1, 60000)
+        clipped = formats.clip_cues(
+            formats.iter_vtt_cues_bytes(buffer, start_ms=window_start), window_start, window_end, rebase=True
+        )
+        assert list(clipped) == _reference(cues, window_start, window_end, rebase=True)
+
+def _cues(*rows):
+    return [{"start": start, "end": end, "text": text} for start, end, text in rows]
+
+def test_retime_scales_then_shifts_and_drops_cues_before_zero():
+    cues = _cues((1000, 2000, "a"), (3000, 4000, "b"), (10000, 11000, "c"))
+    retimed = transforms.retime(cues, shift_ms=-4500, scale=1.5)
+    assert list(retimed) == _cues((0, 1500, "b"), (10500, 12000, "c"))
+
+def test_merge_joins_close_cues_within_the_character_budget():
+    cues = _cues((0, 1000, "one"), (1200, 2000, "two"), (2100, 3000, ""), (5000, 6000, "far"), (6100, 7000, "x" * 10))
+    merged = transforms.merge(cues, gap_ms=500, max_chars=12)
+    assert list(merged) == _cues((0, 3000, "one two"), (5000, 6000, "far"), (6100, 7000, "x" * 10))
+
+def test_wrap_breaks_only_long_lines():
+    cues = _cues((0, 1000, "short\na line that is too long"))
+    assert [cue["text"] for cue in transforms.wrap(cues, width=12)] == ["short\na line that\nis too long"]
+
+def test_split_shares_the_duration_by_length():
+    cues = _cues((0, 3000, "aa\nb\ncccc"), (4000, 5000, "one\ntwo"))
+    assert list(transforms.split(cues, max_lines=2)) == _cues(
+        (0, 1500, "aa\nb"), (1500, 3000, "cccc"), (4000, 5000, "one\ntwo")
+    )
+
+def test_fix_overlaps_trims_to_the_next_start():
+    cues = _cues((0, 3000, "a"), (2000, 4000, "b"), (1000, 5000, "c"))
+    assert list(transforms.fix_overlaps(cues)) == _cues((0, 2000, "a"), (2000, 2000, "b"), (1000, 5000, "c"))
+
+def test_pipeline_is_empty_by_default():
+    assert transforms.build_pipeline(transforms.TRANSFORM_DEFAULTS) == []
+    cues = iter(_cues((0, 1000, "a")))
+    assert transforms.apply_transforms(cues, {}) is cues
+
+def test_cli_applies_every_transform(tmp_path):
+    cues = [(s * 1000, s * 1000 + 900, f"word{s} " * 3) for s in range(20)]
+    source = tmp_path / "in.vtt"
+    source.write_bytes(_vtt(cues))
+    output = tmp_path / "out"
+    options = ["--shift", "-500", "--scale", "2", "--merge", "200", "--max-line-length", "16", "--max-lines", "2", "--fix-overlaps"]
+    cli.main([str(source), "-o", str(output), "--srt", "-f", "vtt", *options])
+
+    config = {
+        "shift_ms": -500, "scale": 2.0, "merge_gap_ms": 200, "max_line_length": 16, "max_lines": 2, "fix_overlaps": True,
+    }
+    expected = transforms.apply_transforms(formats.iter_vtt_cues_bytes(_vtt(cues)), config)
+    assert (output / "in.srt").read_text(encoding="utf-8") == formats.generate_srt(formats.CueTable.from_cues(expected))
@@ -0,0 +1,29 @@
+from subconverter import manifest
+
+BASE = {
+    "input_format": "json",
+    "export_srt": True,
+    "export_vtt": False,
+    "export_txt": False,
+    "export_json": False,
+    "naming_strategy": "source",
+    "custom_name": "output",
+    "suffix_text": "_subtitle",
+    "separate_folders": False,
+}
+
+def test_json_style_only_counts_when_json_is_exported_in_a_non_default_style():
+    plain = manifest.config_fingerprint(BASE)
+    assert manifest.config_fingerprint({**BASE, "json_style": "pretty"}) == plain
+    assert manifest.config_fingerprint({**BASE, "json_style": None}) == plain
+    assert manifest.config_fingerprint({**BASE, "json_style": "compact"}) == plain
+
+    with_json = {**BASE, "export_json": True}
+    assert manifest.config_fingerprint({**with_json, "json_style": "pretty"}) == manifest.config_fingerprint(with_json)
+    assert manifest.config_fingerprint({**with_json, "json_style": "compact"}) != manifest.config_fingerprint(with_json)
+
+def test_default_transform_options_leave_the_fingerprint_alone():
+    plain = manifest.config_fingerprint(BASE)
+    defaults = {"shift_ms": 0, "scale": 1.0, "merge_gap_ms": None, "fix_overlaps": False}
+    assert manifest.config_fingerprint({**BASE, **defaults}) == plain
+    assert manifest.config_fingerprint({**BASE, "merge_gap_ms": 0}) != plain
@@ -0,0 +1,26 @@
+import pytest
+
+from subconverter import metrics
+
+@pytest.mark.parametrize("values, fraction, expected", [
+    ([1, 2], 0.5, 1),
+    ([1, 2, 3, 4, 5, 6], 0.5, 3),
+    (list(range(1, 101)), 0.99, 99),
+    (list(range(1, 101)), 0.07, 7),
+    (list(range(1, 101)), 1.0, 100),
+    ([5], 0.0, 5),
+    ([], 0.5, 0.0),
+])
+def test_nearest_rank_percentile(values, fraction, expected):
+    assert metrics._percentile(values, fraction) == expected
+
+def test_histogram_percentile_uses_nearest_rank():
+    histogram = metrics.Histogram(bounds=(1.0, 2.0, 3.0))
+    for value in (0.5, 1.5):
+        histogram.observe(value)
+    assert histogram.percentile(0.5) == 1.0
+    for value in (0.5, 0.5, 2.5, 2.5):
+        histogram.observe(value)
+    # Sorted: 0.5 0.5 0.5 1.5 2.5 2.5; the 3rd value is in the first bucket
+    assert histogram.percentile(0.5) == 1.0
+    assert histogram.percentile(0.99) == 3.0
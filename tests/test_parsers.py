@@ -0,0 +1,217 @@
+import codecs
+import io
+import json
+
+import pytest
+
+from subconverter import bench, decoders, formats
+
+VTT_DOCUMENTS = {
+    "basic": (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:02.500\nHello\n\n"
+        "00:00:03.000 --> 00:00:04.000\nTwo\nlines\n"
+    ),
+    "header_ids_settings": (
+        "WEBVTT - title\nKind: captions\nLanguage: en\n\n"
+        "1\n00:00:01.000 --> 00:00:02.000 align:start position:0%\nFirst\n\n"
+        "intro\n00:01:02.345 --> 01:02:03.456 line:90%\nSecond\n"
+    ),
+    "note_style_region": (
+        "WEBVTT\n\n"
+        "STYLE\n::cue { color: yellow }\n\n"
+        "REGION\nid:fred width:40%\n\n"
+        "NOTE this is a comment\nspanning lines\n\n"
+        "00:00:01.000 --> 00:00:02.000\nKept\n\n"
+        "NOTE\nanother comment\n\n"
+        "00:00:03.000 --> 00:00:04.000\nAlso kept\n"
+    ),
+    "short_timestamps": (
+        "WEBVTT\n\n"
+        "00:01.000 --> 00:02.500\nNo hours\n\n"
+        "59:59.999 --> 01:00:00.000\nMixed\n"
+    ),
+    "crlf_bom": (
+        "﻿WEBVTT\r\n\r\n"
+        "00:00:01.000 --> 00:00:02.000\r\nCRLF\r\nlines\r\n\r\n"
+        "00:00:03.000 --> 00:00:04.000\r\nEnd\r\n"
+    ),
+    "no_trailing_newline": "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nLast",
+}
+
+VTT_EXPECTED = {
+    "note_style_region": [
+        {"start": 1000, "end": 2000, "text": "Kept"},
+        {"start": 3000, "end": 4000, "text": "Also kept"},
+    ],
+    "short_timestamps": [
+        {"start": 1000, "end": 2500, "text": "No hours"},
+        {"start": 3599999, "end": 3600000, "text": "Mixed"},
+    ],
+    "crlf_bom": [
+        {"start": 1000, "end": 2000, "text": "CRLF\nlines"},
+        {"start": 3000, "end": 4000, "text": "End"},
+    ],
+}
+
+SRT_DOCUMENTS = {
+    "basic": (
+        "1\n00:00:01,000 --> 00:00:02,500\nHello\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nTwo\nlines\n"
+    ),
+    "bom_crlf": (
+        "﻿1\r\n00:00:01,000 --> 00:00:02,000\r\nWith BOM\r\n\r\n"
+        "2\r\n00:00:03,000 --> 00:00:04,000\r\nCRLF\r\n"
+    ),
+    "missing_index": (
+        "00:00:01,000 --> 00:00:02,000\nNo index\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nIndexed\n"
+    ),
+    "missing_blank_line": (
+        "1\n00:00:01,000 --> 00:00:02,000\nFirst\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nSecond\n"
+        "00:00:05,000 --> 00:00:06,000\nThird\n"
+    ),
+    "numeric_text": (
+        "1\n00:00:01,000 --> 00:00:02,000\n42\nis the answer\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nDone\n"
+    ),
+}
+
+SRT_EXPECTED = {
+    "bom_crlf": [
+        {"start": 1000, "end": 2000, "text": "With BOM"},
+        {"start": 3000, "end": 4000, "text": "CRLF"},
+    ],
+    "missing_index": [
+        {"start": 1000, "end": 2000, "text": "No index"},
+        {"start": 3000, "end": 4000, "text": "Indexed"},
+    ],
+    "missing_blank_line": [
+        {"start": 1000, "end": 2000, "text": "First"},
+        {"start": 3000, "end": 4000, "text": "Second"},
+        {"start": 5000, "end": 6000, "text": "Third"},
+    ],
+    "numeric_text": [
+        {"start": 1000, "end": 2000, "text": "42\nis the answer"},
+        {"start": 3000, "end": 4000, "text": "Done"},
+    ],
+}
+
+@pytest.mark.parametrize("name", sorted(VTT_DOCUMENTS))
+def test_vtt_text_and_bytes_parsers_agree(name):
+    document = VTT_DOCUMENTS[name]
+    expected = formats.parse_vtt(document)
+    assert expected
+    assert list(formats.iter_vtt_cues_bytes(document.encode("utf-8"))) == expected
+    if name in VTT_EXPECTED:
+        assert expected == VTT_EXPECTED[name]
+
+@pytest.mark.parametrize("name", sorted(SRT_DOCUMENTS))
+def test_srt_text_and_bytes_parsers_agree(name):
+    document = SRT_DOCUMENTS[name]
+    expected = formats.parse_srt(document)
+    assert expected
+    assert list(formats.iter_srt_cues_bytes(document.encode("utf-8"))) == expected
+    if name in SRT_EXPECTED:
+        assert expected == SRT_EXPECTED[name]
+
+@pytest.mark.parametrize("name", ["basic", "header_ids_settings"])
+def test_vtt_parser_matches_legacy_parser(name):
+    document = VTT_DOCUMENTS[name]
+    assert formats.parse_vtt(document) == bench._legacy_parse_vtt(document)
+
+def test_generated_vtt_matches_legacy_parser():
+    # Cue ids, settings and multi-line text; large enough to cross parser batches
+    document = bench.make_vtt(3000, seed=5)
+    expected = bench._legacy_parse_vtt(document)
+    assert formats.parse_vtt(document) == expected
+    assert list(formats.iter_vtt_cues_bytes(document.encode("utf-8"))) == expected
+
+def test_srt_round_trip_through_both_parsers():
+    table = formats.CueTable.from_cues(formats.parse_vtt(bench.make_vtt(3000, seed=7)))
+    document = formats.generate_srt(table)
+    expected = [{"start": s, "end": e, "text": t.strip()} for s, e, t in table.rows()]
+    assert formats.parse_srt(document) == expected
+    assert list(formats.iter_srt_cues_bytes(document.encode("utf-8"))) == expected
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-16-le", "utf-32"])
+@pytest.mark.parametrize("kind", ["vtt", "srt"])
+def test_utf16_and_utf32_input_is_rejected(kind, encoding):
+    document = (VTT_DOCUMENTS["basic"] if kind == "vtt" else SRT_DOCUMENTS["bom_crlf"].lstrip("\ufeff"))
+    data = document.encode(encoding)
+    scan = formats.iter_vtt_cues_bytes if kind == "vtt" else formats.iter_srt_cues_bytes
+    with pytest.raises(ValueError):
+        list(scan(data))
+    if data.startswith((codecs.BOM_UTF16, codecs.BOM_UTF32)):
+        with pytest.raises(UnicodeDecodeError):
+            data.decode("utf-8")  # What the text path would read
+
+@pytest.mark.parametrize("document, scan", [
+    (b"WEBVTT\n\nNOTE caf\xe9\n\n00:00:01.000 --> 00:00:02.000\nHello\n", formats.iter_vtt_cues_bytes),
+    (b"WEBVTT - caf\xe9\n\n00:00:01.000 --> 00:00:02.000\nHello\n", formats.iter_vtt_cues_bytes),
+    (b"1\n00:00:01,000 --> 00:00:02,000\nHello\n\ncaf\xe9\n", formats.iter_srt_cues_bytes),
+])
+def test_invalid_utf8_outside_cue_text_is_rejected(document, scan):
+    # The text path fails on decoding; the byte scanner must not accept it
+    with pytest.raises(UnicodeDecodeError):
+        document.decode("utf-8")
+    with pytest.raises(UnicodeDecodeError):
+        list(scan(document))
+
+def test_cues_without_text_are_dropped():
+    vtt = (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:02.000\n\n"
+        "id\n00:00:02.000 --> 00:00:03.000\n   \n\n"
+        "00:00:03.000 --> 00:00:04.000\nKept\n"
+    )
+    srt = (
+        "1\n00:00:01,000 --> 00:00:02,000\n\n"
+        "2\n00:00:02,000 --> 00:00:03,000\n"
+        "3\n00:00:03,000 --> 00:00:04,000\nKept\n"
+    )
+    expected = [{"start": 3000, "end": 4000, "text": "Kept"}]
+    assert formats.parse_vtt(vtt) == expected
+    assert list(formats.iter_vtt_cues_bytes(vtt.encode("utf-8"))) == expected
+    assert list(formats.iter_vtt_cues(io.StringIO(vtt), batch_size=1)) == expected
+    assert formats.parse_srt(srt) == expected
+    assert list(formats.iter_srt_cues_bytes(srt.encode("utf-8"))) == expected
+    assert list(formats.iter_srt_cues(io.StringIO(srt), batch_size=1)) == expected
+
+def test_malformed_timestamp_skips_only_that_cue():
+    document = (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:02.000\nGood\n\n"
+        "00:00:xx.000 --> 00:00:04.000\nBad\n\n"
+        "00:00:05.000 --> 00:00:06.000\nAlso good\n"
+    )
+    texts = [cue["text"] for cue in formats.parse_vtt(document)]
+    assert texts == ["Good", "Also good"]
+
+def test_streaming_json_reader_matches_json_loads():
+    data = bench.make_youtube_json(2000, seed=3)
+    document = json.dumps(data, ensure_ascii=False)
+    # A tiny chunk size makes values straddle every read boundary
+    events = list(formats.iter_json_events(io.StringIO(document), chunk_size=7))
+    assert events == data["events"]
+    assert list(formats.iter_json_cues(events)) == formats.convert_json_to_subtitles(data)
+
+@pytest.mark.parametrize("decoder", decoders.available_json_decoders())
+def test_json_decoders_agree(decoder):
+    data = bench.make_youtube_json(2000, seed=4)
+    buffer = codecs.BOM_UTF8 + json.dumps(data, ensure_ascii=False).encode("utf-8")
+    cues = list(formats.iter_json_cues(decoders.iter_json_buffer_events(buffer, decoder)))
+    assert cues == formats.convert_json_to_subtitles(data)
+
+@pytest.mark.parametrize("decoder", decoders.available_json_decoders())
+def test_float_json_times_are_whole_milliseconds(decoder):
+    buffer = b'{"events": [{"tStartMs": 1000.0, "dDurationMs": 1500.0, "segs": [{"utf8": "Hi"}]}]}'
+    cues = list(formats.iter_json_cues(decoders.iter_json_buffer_events(buffer, decoder)))
+    assert cues == [{"start": 1000, "end": 2500, "text": "Hi"}]
+    assert all(type(cue["start"]) is int and type(cue["end"]) is int for cue in cues)
+    assert formats.generate_srt(formats.CueTable.from_cues(cues)) == "1\n00:00:01,000 --> 00:00:02,500\nHi\n"
+
+def test_cue_table_rounds_float_times():
+    table = formats.CueTable.from_cues([{"start": 1000.0, "end": 2499.6, "text": "Hi"}])
+    assert list(table.rows()) == [(1000, 2500, "Hi")]
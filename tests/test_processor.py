@@ -0,0 +1,236 @@
+import io
+import json
+import os
+import tarfile
+import zipfile
+import pytest
+from subconverter import decoders, formats, processor
+
+VTT = "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nfrom vtt\n"
+JSON = '{"events": [{"tStartMs": 1000, "dDurationMs": 1000, "segs": [{"utf8": "from json"}]}]}'
+
+def _config(input_path, output_dir, **overrides):
+    config = {
+        "input_path": str(input_path),
+        "output_dir": str(output_dir),
+        "is_directory": input_path.is_dir(),
+        "input_format": "auto",
+        "export_srt": True,
+        "export_vtt": False,
+        "export_txt": False,
+        "export_json": False,
+        "naming_strategy": "source",
+        "custom_name": "output",
+        "suffix_text": "_subtitle",
+        "separate_folders": False,
+    }
+    config.update(overrides)
+    return config
+
+def _mixed_folder(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir(parents=True)
+    (folder / "c0.vtt").write_text(VTT, encoding="utf-8")
+    (folder / "c0.json").write_text(JSON, encoding="utf-8")
+    (folder / "c1.vtt").write_text(VTT, encoding="utf-8")
+    return folder
+
+def _corpus(tmp_path, count=6):
+    # Nested folders and both input formats, several cues each
+    folder = tmp_path / "in"
+    (folder / "sub").mkdir(parents=True)
+    for i in range(count):
+        cues = [(s * 1500 + i, s * 1500 + 1200 + i, f"cue {s} of file {i}") for s in range(40)]
+        vtt = "WEBVTT\n\n" + "\n".join(
+            f"{formats.ms_to_vtt_time(start)} --> {formats.ms_to_vtt_time(end)}\n{text}\n" for start, end, text in cues
+        )
+        events = [{"tStartMs": start, "dDurationMs": end - start, "segs": [{"utf8": text}]} for start, end, text in cues]
+        parent = folder / "sub" if i % 2 else folder
+        (parent / f"v{i}.vtt").write_text(vtt, encoding="utf-8")
+        (parent / f"j{i}.json").write_text(json.dumps({"events": events}), encoding="utf-8")
+    return folder
+
+def _tree(folder):
+    """{relative path: bytes} for every file under folder, the manifest aside"""
+    return {
+        os.path.relpath(os.path.join(root, name), folder): open(os.path.join(root, name), "rb").read()
+        for root, _, names in os.walk(folder)
+        for name in names
+        if not name.startswith(".subconvert")
+    }
+
+ALL_FORMATS = {"export_srt": True, "export_vtt": True, "export_txt": True, "export_json": True}
+
+def _run(config, use_async=False):
+    messages = []
+    callback = lambda current, total, message: messages.append(message)
+    if use_async:
+        import asyncio
+        asyncio.run(processor.run_conversion_async(config, callback))
+    else:
+        processor.run_conversion(config, callback)
+    return messages
+
+def test_clashing_outputs_fail_the_later_input(tmp_path):
+    for mode, overrides in (("plain", {}), ("jobs", {"workers": 2}), ("async", {})):
+        folder = _mixed_folder(tmp_path / mode)
+        output = tmp_path / mode / "out"
+        messages = _run(_config(folder, output, **overrides), use_async=mode == "async")
+
+        errors = [m for m in messages if m.startswith("Error on c0.")]
+        assert len(errors) == 1, (mode, messages)
+        loser = errors[0].split(":")[0][len("Error on "):]
+        winner = "from vtt" if loser == "c0.json" else "from json"
+        assert winner in (output / "c0.srt").read_text(encoding="utf-8")
+        assert (output / "c1.srt").exists()
+
+def test_custom_name_batch_does_not_overwrite(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for name in ("a.vtt", "b.vtt"):
+        (folder / name).write_text(VTT, encoding="utf-8")
+    messages = _run(_config(folder, tmp_path / "out", naming_strategy="custom"))
+    assert sum(m.startswith("Error on ") for m in messages) == 1
+    assert (tmp_path / "out" / "output.srt").exists()
+
+def test_default_selection_ignores_extension_case(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    (folder / "A.VTT").write_text(VTT, encoding="utf-8")
+    (folder / "X.JSON").write_text(JSON, encoding="utf-8")
+    (folder / "notes.txt").write_text("not a subtitle", encoding="utf-8")
+    found = sorted(os.path.basename(p) for p in processor.iter_target_files(_config(folder, tmp_path / "out")))
+    assert found == ["A.VTT", "X.JSON"]
+
+    only_vtt = processor.iter_target_files(_config(folder, tmp_path / "out", input_format="vtt"))
+    assert [os.path.basename(p) for p in only_vtt] == ["A.VTT"]
+
+    _run(_config(folder, tmp_path / "out"))
+    assert sorted(os.listdir(tmp_path / "out")) == ["A.srt", "X.srt"]
+
+def test_process_pool_does_not_fork():
+    # Pools start while the prefetch thread runs, so forking is unsafe
+    with processor._process_pool(1) as pool:
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+def test_async_rejects_zero_concurrency(tmp_path):
+    folder = _mixed_folder(tmp_path)
+    import asyncio
+    with pytest.raises(ValueError):
+        asyncio.run(processor.run_conversion_async(_config(folder, tmp_path / "out", concurrency=0)))
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_run_matches_sequential(tmp_path, workers):
+    folder = _corpus(tmp_path)
+    options = dict(ALL_FORMATS, recursive=True, separate_folders=True)
+    _run(_config(folder, tmp_path / "seq", **options))
+    messages = _run(_config(folder, tmp_path / "par", workers=workers, **options))
+    expected = _tree(tmp_path / "seq")
+    assert len(expected) == 12 * 4
+    assert _tree(tmp_path / "par") == expected
+    assert not any(m.startswith("Error on ") for m in messages)
+
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize("decoder", ["auto", *decoders.available_json_decoders()])
+def test_streaming_and_decoders_match_whole_file_conversion(tmp_path, streaming, decoder):
+    folder = _corpus(tmp_path, count=2)
+    options = dict(ALL_FORMATS, recursive=True, merge_gap_ms=500, max_line_length=10)
+    _run(_config(folder, tmp_path / "whole", **options))
+    _run(_config(folder, tmp_path / "out", streaming=streaming, json_decoder=decoder, **options))
+    expected = _tree(tmp_path / "whole")
+    assert len(expected) == 4 * 4
+    assert _tree(tmp_path / "out") == expected
+
+def test_incremental_run_skips_unchanged_inputs_and_removes_stale_outputs(tmp_path):
+    folder = _mixed_folder(tmp_path)
+    (folder / "c0.json").unlink()
+    output = tmp_path / "out"
+    config = _config(folder, output, incremental=True)
+    assert "(2 converted, 0 skipped, 0 failed)" in _run(config)[-1]
+    assert "(0 converted, 2 skipped, 0 failed)" in _run(config)[-1]
+
+    # An edited input is converted again
+    (folder / "c1.vtt").write_text(VTT.replace("from vtt", "edited"), encoding="utf-8")
+    assert "(1 converted, 1 skipped, 0 failed)" in _run(config)[-1]
+    assert "edited" in (output / "c1.srt").read_text(encoding="utf-8")
+
+    # Other options convert everything again, and drop outputs no longer produced
+    messages = _run(_config(folder, output, incremental=True, export_srt=False, export_vtt=True))
+    assert "(2 converted, 0 skipped, 0 failed)" in messages[-1]
+    assert sorted(p.name for p in output.iterdir() if not p.name.startswith(".")) == ["c0.vtt", "c1.vtt"]
+
+    # A deleted input takes its outputs with it
+    (folder / "c0.vtt").unlink()
+    messages = _run(_config(folder, output, incremental=True, export_srt=False, export_vtt=True))
+    assert "Removed stale output: c0.vtt" in messages
+    assert sorted(p.name for p in output.iterdir() if not p.name.startswith(".")) == ["c1.vtt"]
+
+@pytest.mark.parametrize("overrides", [{}, {"workers": 2}, {"concurrency": 1}, {"incremental": True}])
+def test_async_run_matches_sync_run(tmp_path, overrides):
+    folder = _corpus(tmp_path)
+    options = dict(ALL_FORMATS, recursive=True, **overrides)
+    _run(_config(folder, tmp_path / "sync", **options))
+    messages = _run(_config(folder, tmp_path / "async", **options), use_async=True)
+    expected = _tree(tmp_path / "sync")
+    assert len(expected) == 12 * 4
+    assert _tree(tmp_path / "async") == expected
+    assert not any(m.startswith("Error on ") for m in messages)
+    if overrides.get("incremental"):
+        assert "(0 converted, 12 skipped, 0 failed)" in _run(_config(folder, tmp_path / "async", **options), use_async=True)[-1]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_many_matches_run_conversion(tmp_path, workers):
+    folder = _corpus(tmp_path, count=2)
+    _run(_config(folder, tmp_path / "out", recursive=True, separate_folders=True, **ALL_FORMATS))
+    expected = _tree(tmp_path / "out")
+
+    sources = {os.path.relpath(path, folder): path.read_bytes() for path in folder.rglob("*.*")}
+    # Every kind of source: bytes, str, and binary and text file objects
+    kinds = [bytes, lambda data: data.decode("utf-8"), io.BytesIO, lambda data: io.StringIO(data.decode("utf-8"))]
+    items = [(name, kinds[i % 4](data)) for i, (name, data) in enumerate(sorted(sources.items()))]
+    items.insert(1, ("broken.vtt", b"WEBVTT\n\n\xff\xfe not utf-8"))
+    sunk = {}
+    config = dict(ALL_FORMATS, separate_folders=True, workers=workers)
+    results = list(processor.convert_many(items, config, sink=sunk.__setitem__))
+
+    assert [name for name, _, _ in results] == [name for name, _ in items]
+    assert results[1][1] == {} and results[1][2]["error"]
+    outputs = {name: data for _, produced, _ in results for name, data in produced.items()}
+    assert outputs == expected
+    assert sunk == expected
+
+def _archive_tree(path):
+    """{member name (os.sep separated): bytes} for a zip or tar archive"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return {name.replace("/", os.sep): archive.read(name) for name in archive.namelist()}
+    with tarfile.open(path) as archive:
+        return {m.name.replace("/", os.sep): archive.extractfile(m).read() for m in archive.getmembers() if m.isfile()}
+
+@pytest.mark.parametrize("source, target", [
+    ("in.zip", "out"),
+    ("in.tar.gz", "out"),
+    (None, "out.zip"),
+    (None, "out.tgz"),
+    ("in.tar", "out.zip"),
+])
+def test_archive_round_trip(tmp_path, source, target):
+    folder = _corpus(tmp_path, count=2)
+    options = dict(ALL_FORMATS, recursive=True, separate_folders=True)
+    _run(_config(folder, tmp_path / "expected", **options))
+    expected = _tree(tmp_path / "expected")
+
+    input_path = folder
+    if source is not None:
+        input_path = tmp_path / source
+        if source.endswith(".zip"):
+            with zipfile.ZipFile(input_path, "w") as archive:
+                for path in sorted(folder.rglob("*.*")):
+                    archive.write(path, path.relative_to(folder).as_posix())
+        else:
+            with tarfile.open(input_path, "w:gz" if source.endswith(".gz") else "w") as archive:
+                archive.add(folder, arcname="")
+    output = tmp_path / target
+    messages = _run(_config(input_path, output, **options))
+    assert not any(m.startswith("Error on ") for m in messages)
+    assert (_tree(output) if output.is_dir() else _archive_tree(output)) == expected
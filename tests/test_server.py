@@ -0,0 +1,55 @@
+import http.client
+import threading
+import pytest
+from subconverter import server as server_module
+
+VTT = b"WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nhello\n"
+
+@pytest.fixture
+def running_server():
+    pool = server_module.ConversionPool(1, 0)
+    httpd = server_module.make_server(pool, {}, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        pool.close()
+
+def _post(httpd, body, length):
+    connection = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+    try:
+        connection.putrequest("POST", "/convert?to=srt")
+        connection.putheader("Content-Length", str(length))
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+def test_converts_body(running_server):
+    status, data = _post(running_server, VTT, len(VTT))
+    assert status == 200
+    assert b"00:00:01,000 --> 00:00:02,000" in data
+
+def test_negative_content_length_is_rejected(running_server):
+    status, _ = _post(running_server, b"", -1)
+    assert status == 400
+
+@pytest.mark.skipif(server_module.UnixConversionHTTPServer is None, reason="no Unix sockets")
+def test_unix_socket_path_must_not_be_a_regular_file(tmp_path):
+    path = tmp_path / "not-a-socket"
+    path.write_text("keep me", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        server_module.make_server(None, {}, unix_socket=str(path))
+    assert path.read_text(encoding="utf-8") == "keep me"
+
+@pytest.mark.skipif(server_module.UnixConversionHTTPServer is None, reason="no Unix sockets")
+def test_stale_unix_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "s.sock")
+    for _ in range(2):
+        httpd = server_module.make_server(None, {}, unix_socket=path)
+        httpd.server_close()  # Leaves the socket file behind
+    assert (tmp_path / "s.sock").is_socket()
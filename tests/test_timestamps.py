@@ -0,0 +1,35 @@
+import pytest
+
+from subconverter import formats
+
+def _python_times_to_ms(time_strs):
+    return [formats.time_to_ms(time_str) for time_str in time_strs]
+
+def _fixed_width_times(count):
+    return [formats.ms_to_vtt_time(i * 1234 + i % 1000) for i in range(count)]
+
+@pytest.mark.skipif(formats.numpy is None, reason="NumPy is not installed")
+@pytest.mark.parametrize("tail", [
+    ["00:00:01.50", "100:00:02.000"],   # 11 + 13 characters: right total, wrong widths
+    ["1:00:00.000", "00:00:00.0000"],
+    ["00:00:01,500", "00:00:02.000"],  # SRT comma, still fixed width
+])
+def test_numpy_batch_matches_python_on_mixed_widths(tail):
+    time_strs = _fixed_width_times(300) + tail
+    assert len(time_strs) >= formats.NUMPY_BATCH_MIN
+    assert formats.times_to_ms(time_strs) == _python_times_to_ms(time_strs)
+
+@pytest.mark.skipif(formats.numpy is None, reason="NumPy is not installed")
+def test_numpy_batch_matches_python_on_fixed_width():
+    time_strs = _fixed_width_times(1000)
+    assert formats._times_to_ms_numpy(time_strs) == _python_times_to_ms(time_strs)
+
+def test_mixed_width_timestamps_through_the_parsers():
+    lines = ["WEBVTT", ""]
+    for i in range(300):
+        lines += [f"{formats.ms_to_vtt_time(i * 1000)} --> {formats.ms_to_vtt_time(i * 1000 + 500)}", f"cue {i}", ""]
+    lines += ["00:00:01.50 --> 100:00:02.000", "odd widths", ""]
+    document = "\n".join(lines)
+    expected = (1050, 360002000)
+    for cues in (formats.parse_vtt(document), list(formats.iter_vtt_cues_bytes(document.encode("utf-8")))):
+        assert (cues[-1]["start"], cues[-1]["end"]) == expected
@@ -0,0 +1,68 @@
+import shutil
+import pytest
+from subconverter import processor, writer
+from test_processor import VTT, _config, _run
+
+def test_nested_batch_publishes_with_its_parent(tmp_path):
+    run = writer.OutputBatch()
+    with run.nested() as batch:
+        batch.write(str(tmp_path / "a" / "x.srt"), "one\n")
+    assert not (tmp_path / "a" / "x.srt").exists()
+    run.commit()
+    assert (tmp_path / "a" / "x.srt").read_text(encoding="utf-8") == "one\n"
+
+def test_failed_nested_batch_leaves_nothing(tmp_path):
+    run = writer.OutputBatch()
+    with pytest.raises(RuntimeError):
+        with run.nested() as batch:
+            batch.write(str(tmp_path / "x.srt"), "one\n")
+            raise RuntimeError("conversion failed")
+    run.commit()
+    assert list(tmp_path.iterdir()) == []
+
+def test_deleted_output_folder_is_created_again(tmp_path):
+    for _ in range(2):
+        with writer.OutputBatch() as batch:
+            batch.write(str(tmp_path / "out" / "x.srt"), "one\n")
+        assert (tmp_path / "out" / "x.srt").exists()
+        shutil.rmtree(tmp_path / "out")
+
+@pytest.mark.parametrize("overrides", [{}, {"workers": 2}, {"streaming": True}])
+def test_run_publishes_its_outputs_together(tmp_path, monkeypatch, overrides):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for i in range(5):
+        (folder / f"c{i}.vtt").write_text(VTT, encoding="utf-8")
+    commits = []
+    commit = writer.OutputBatch.commit
+
+    def counting_commit(self):
+        if self.parent is None:
+            commits.append(len(self.pending))
+        commit(self)
+
+    monkeypatch.setattr(writer.OutputBatch, "commit", counting_commit)
+    _run(_config(folder, tmp_path / "out", fsync=True, export_vtt=True, **overrides))
+    assert commits == [10]
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == sorted(
+        f"c{i}.{ext}" for i in range(5) for ext in ("srt", "vtt")
+    )
+
+def test_interrupted_run_publishes_nothing_unrecorded(tmp_path, monkeypatch):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for i in range(3):
+        (folder / f"c{i}.vtt").write_text(VTT, encoding="utf-8")
+
+    def interrupt(current, total, message):
+        if message.startswith("Processing 3/"):
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        processor.run_conversion(_config(folder, tmp_path / "out", incremental=True), interrupt)
+    # Neither outputs nor manifest entries for the unpublished files, and no temporary files
+    leftovers = [p.name for p in (tmp_path / "out").iterdir() if not p.name.startswith(".subconvert")]
+    assert leftovers == []
+    messages = _run(_config(folder, tmp_path / "out", incremental=True))
+    assert "(3 converted, 0 skipped, 0 failed)" in messages[-1]
+    assert sorted(p.name for p in (tmp_path / "out").glob("*.srt")) == ["c0.srt", "c1.srt", "c2.srt"]